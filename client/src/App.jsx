@@ -3,7 +3,7 @@ import { Link } from 'react-router-dom'
 import { ShoppingCart, LogIn, User, Search, Package, Factory, Menu, Phone, ChevronRight, LayoutGrid, LogOut } from 'lucide-react'
 import api from './api/axios'
 import { getMe, logout } from './api/auth'
-import { getCart, addToCart, updateCartItem, removeFromCart, clearCart } from './api/cart'
+import { getCart, addToCart, mergeCart, updateCartItem, removeFromCart, clearCart } from './api/cart'
 import AuthModal from './components/AuthModal'
 import CartDrawer from './components/CartDrawer'
 import DynamicMegaMenu from './components/DynamicMegaMenu'
@@ -75,11 +75,7 @@ function App() {
 
       if (isLogin && localCart.length > 0) {
         // Merge local cart into server cart only on login
-        for (const item of localCart) {
-          await addToCart(item.id, item.quantity)
-        }
-        // Fetch again after merging
-        const finalServerCart = await getCart()
+        const finalServerCart = await mergeCart(localCart)
         const mergedCart = finalServerCart.map(item => ({
           ...item.product,
           quantity: item.quantity
@@ -125,7 +121,9 @@ function App() {
   useEffect(() => {
     if (!user) return; // Only connect if user is logged in
 
+    // The server only accepts authenticated sockets and joins them to the user's room
     const socket = io(config.apiUrl, {
+      auth: { token: localStorage.getItem('token') },
       transports: ['websocket', 'polling']
     });
 
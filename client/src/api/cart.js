@@ -10,6 +10,11 @@ export const addToCart = async (productId, quantity = 1) => {
     return response.data;
 };
 
+export const mergeCart = async (items) => {
+    const response = await api.post('/cart/merge', items.map(item => ({ product_id: item.id, quantity: item.quantity })));
+    return response.data;
+};
+
 export const updateCartItem = async (productId, quantity) => {
     const response = await api.put(`/cart/${productId}`, { quantity });
     return response.data;
@@ -15,6 +15,8 @@ const AdminOrders = () => {
         // Connect to Socket.IO server
         const socket = io(config.apiUrl, {
             // Default path is /socket.io, which matches our new server setup (root wrap)
+            // Admin tokens join the room that receives new_order events
+            auth: { token: localStorage.getItem('token') },
             transports: ['websocket', 'polling']
         });
 
@@ -22,13 +24,19 @@ const AdminOrders = () => {
             console.log('Connected to socket server');
         });
 
-        socket.on('new_order', (data) => {
-            console.log('New order received:', data);
+        // Orders placed within a short window arrive together as one list
+        socket.on('new_order', (newOrders) => {
+            console.log('New orders received:', newOrders);
             // Option A: Re-fetch all orders
             fetchOrders();
             // Option B: Append to state (if valid format). Re-fetching is safer for sync.
             // Show notification
-            alert(`Có đơn hàng mới! Khách: ${data.customer_name} - ${data.total_amount.toLocaleString()}đ`);
+            if (newOrders.length === 1) {
+                const data = newOrders[0];
+                alert(`Có đơn hàng mới! Khách: ${data.customer_name} - ${data.total_amount.toLocaleString()}đ`);
+            } else {
+                alert(`Có ${newOrders.length} đơn hàng mới!`);
+            }
         });
 
         return () => {
@@ -8,6 +8,28 @@ module.exports = {
             interpreter: 'python3',
             env: {
                 NODE_ENV: 'production',
+                // Per worker and per engine (sync + async): 4 workers x 2 x (5 + 5)
+                // = up to 80 connections, keep below PostgreSQL max_connections
+                DB_POOL_SIZE: '5',
+                DB_MAX_OVERFLOW: '5',
+                // Carts must be shared by the 4 workers
+                CART_BACKEND: 'redis',
+                REDIS_URL: 'redis://127.0.0.1:6379/0',
+                // Socket.IO events emitted by one worker reach clients of all workers
+                SOCKETIO_MESSAGE_QUEUE: 'redis://127.0.0.1:6379/0',
+            },
+        },
+        {
+            // Delivers the e-mails queued in the email_outbox table
+            name: 'shop-co-khi-email-worker',
+            script: 'venv/bin/python',
+            args: '-m app.services.email_worker',
+            cwd: '/var/www/shop-co-khi/server',
+            interpreter: 'none',
+            env: {
+                NODE_ENV: 'production',
+                DB_POOL_SIZE: '2',
+                DB_MAX_OVERFLOW: '0',
             },
         },
     ],
@@ -0,0 +1,30 @@
+"""Add product updated_at
+
+Revision ID: 3b7e91c5d0a4
+Revises: f2d6a18c94e3
+Create Date: 2026-01-12 10:21:08.604512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e91c5d0a4'
+down_revision: Union[str, Sequence[str], None] = 'f2d6a18c94e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Existing rows get the migration time as their first known modification
+    op.add_column('product', sa.Column('updated_at', sa.DateTime(), server_default=sa.func.now(), nullable=True))
+    op.alter_column('product', 'updated_at', server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('product', 'updated_at')
@@ -0,0 +1,49 @@
+"""Add cart item user product unique
+
+Revision ID: 7c3f0b9e2d61
+Revises: 9a4c2e7f1b58
+Create Date: 2026-01-15 10:21:37.405118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3f0b9e2d61'
+down_revision: Union[str, Sequence[str], None] = '9a4c2e7f1b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Fold duplicate lines (left by concurrent adds) into the oldest one first
+    op.execute(
+        """
+        UPDATE cart_item SET quantity = dup.total
+        FROM (
+            SELECT MIN(id) AS id, SUM(quantity) AS total
+            FROM cart_item
+            GROUP BY user_id, product_id
+            HAVING COUNT(*) > 1
+        ) AS dup
+        WHERE cart_item.id = dup.id
+        """
+    )
+    op.execute(
+        """
+        DELETE FROM cart_item USING cart_item AS kept
+        WHERE cart_item.user_id = kept.user_id
+          AND cart_item.product_id = kept.product_id
+          AND cart_item.id > kept.id
+        """
+    )
+    op.create_unique_constraint('uq_cart_item_user_product', 'cart_item', ['user_id', 'product_id'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_cart_item_user_product', 'cart_item', type_='unique')
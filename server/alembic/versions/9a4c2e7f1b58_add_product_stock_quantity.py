@@ -0,0 +1,34 @@
+"""Add product stock quantity
+
+Revision ID: 9a4c2e7f1b58
+Revises: 3b7e91c5d0a4
+Create Date: 2026-01-14 16:08:52.117390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4c2e7f1b58'
+down_revision: Union[str, Sequence[str], None] = '3b7e91c5d0a4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # NULL = not tracked, so existing products keep selling as before
+    op.add_column('product', sa.Column('stock_quantity', sa.Integer(), nullable=True))
+    op.create_check_constraint(
+        'ck_product_stock_quantity_non_negative', 'product',
+        'stock_quantity IS NULL OR stock_quantity >= 0'
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('ck_product_stock_quantity_non_negative', 'product', type_='check')
+    op.drop_column('product', 'stock_quantity')
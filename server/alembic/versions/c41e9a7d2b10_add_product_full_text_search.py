@@ -0,0 +1,66 @@
+"""Add product full-text search
+
+Revision ID: c41e9a7d2b10
+Revises: 5bfda775e2e1
+Create Date: 2026-01-06 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e9a7d2b10'
+down_revision: Union[str, Sequence[str], None] = '5bfda775e2e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.add_column('product', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # 'simple' config + unaccent: no stemming (product names are mixed VN/EN/SKU),
+    # diacritics folded so "mui khoan" matches "Mũi Khoan".
+    op.execute("""
+        CREATE OR REPLACE FUNCTION product_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('simple', unaccent(coalesce(NEW.name, ''))), 'A') ||
+                setweight(to_tsvector('simple', unaccent(coalesce(NEW.sku, ''))), 'A') ||
+                setweight(to_tsvector('simple', unaccent(concat_ws(' ', NEW.material, NEW.coating, NEW.diameter))), 'B') ||
+                setweight(to_tsvector('simple', unaccent(coalesce(NEW.description, ''))), 'C');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER product_search_vector_trigger
+        BEFORE INSERT OR UPDATE OF name, sku, description, material, coating, diameter
+        ON product
+        FOR EACH ROW EXECUTE FUNCTION product_search_vector_update()
+    """)
+
+    # Backfill existing rows through the trigger
+    op.execute("UPDATE product SET name = name")
+
+    op.create_index('ix_product_search_vector', 'product', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index(
+        'ix_product_sku_trgm', 'product', ['sku'], unique=False,
+        postgresql_using='gin', postgresql_ops={'sku': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_product_sku_trgm', table_name='product')
+    op.drop_index('ix_product_search_vector', table_name='product')
+    op.execute("DROP TRIGGER IF EXISTS product_search_vector_trigger ON product")
+    op.execute("DROP FUNCTION IF EXISTS product_search_vector_update()")
+    op.drop_column('product', 'search_vector')
@@ -0,0 +1,28 @@
+"""Add order keyset pagination index
+
+Revision ID: e8b05f3c7a21
+Revises: c41e9a7d2b10
+Create Date: 2026-01-08 14:03:27.551930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8b05f3c7a21'
+down_revision: Union[str, Sequence[str], None] = 'c41e9a7d2b10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_order_created_at_id', 'order', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_order_created_at_id', table_name='order')
@@ -1,14 +1,16 @@
-from typing import Generator, Optional
-from fastapi import Depends, HTTPException, status
+from typing import AsyncGenerator, Generator, Optional
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.core import security
 from app.core.config import settings
-from app.db.session import SessionLocal
+from app.db.replicas import wrote_recently
+from app.db.session import AsyncSessionLocal, ReadSessionLocal, SessionLocal, replica_router
 from app.repositories.user_repository import user_repository
 
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
@@ -22,19 +24,38 @@ def get_db() -> Generator:
     finally:
         db.close()
 
-def get_current_user(
-    db: Session = Depends(get_db), token: HTTPAuthorizationCredentials = Depends(security_scheme)
-) -> models.user.User:
+def get_read_db(request: Request) -> Generator:
+    """
+    Session for public catalog reads: served by a read replica when one is configured
+    and healthy, by the primary for clients that just wrote something.
+    """
+    replica = None if wrote_recently(request.cookies) else replica_router.choose()
+    try:
+        db = ReadSessionLocal(replica=replica)
+        yield db
+    finally:
+        db.close()
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def _decode_token(token: HTTPAuthorizationCredentials) -> schemas.TokenPayload:
     try:
         payload = jwt.decode(
             token.credentials, settings.SECRET_KEY, algorithms=[security.ALGORITHM]
         )
-        token_data = schemas.TokenPayload(**payload)
+        return schemas.TokenPayload(**payload)
     except (JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+
+def get_current_user(
+    db: Session = Depends(get_db), token: HTTPAuthorizationCredentials = Depends(security_scheme)
+) -> models.user.User:
+    token_data = _decode_token(token)
     user = user_repository.get(db, id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -55,3 +76,18 @@ def get_current_active_superuser(
             status_code=400, detail="The user doesn't have enough privileges"
         )
     return current_user
+
+async def get_current_active_user_async(
+    db: AsyncSession = Depends(get_async_db), token: HTTPAuthorizationCredentials = Depends(security_scheme)
+) -> models.user.User:
+    """
+    get_current_active_user for async endpoints: the user is loaded through the
+    async session, so authentication doesn't take a threadpool slot.
+    """
+    token_data = _decode_token(token)
+    user = await db.get(models.user.User, token_data.sub) if token_data.sub is not None else None
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
@@ -1,23 +1,32 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app import schemas, models
 from app.api import deps
+from app.core import socket_manager
 from app.models.order import Order, OrderStatus
+from app.repositories.email_outbox_repository import email_outbox_repository
 from app.repositories.order_repository import order_repository
+from app.services.inventory_service import inventory_metrics
+from app.db.pool import async_pool_metrics, sync_pool_metrics
+from app.db.session import async_engine, engine, replica_engines, replica_pool_metrics, replica_router
 
 router = APIRouter()
 
-@router.get("/orders", response_model=List[schemas.order.Order])
+@router.get("/orders", response_model=Union[List[schemas.order.Order], schemas.CursorPage[schemas.order.Order]])
 def get_orders(
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description=schemas.pagination.CURSOR_DESCRIPTION),
     current_user: models.user.User = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """
-    Retrieve all orders. Only for superusers.
+    Retrieve all orders, newest first. Only for superusers.
     """
+    if cursor is not None:
+        items, next_cursor = order_repository.get_page(db, cursor=cursor, limit=limit)
+        return {"items": items, "next_cursor": next_cursor}
     orders = db.query(Order).order_by(Order.created_at.desc()).offset(skip).limit(limit).all()
     return orders
 
@@ -36,8 +45,50 @@ def update_order_status(
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    order.status = status
-    db.add(order)
-    db.commit()
-    db.refresh(order)
+    order = order_repository.update_status(db, db_obj=order, status=status)
     return order
+
+@router.get("/inventory/metrics")
+def get_inventory_metrics(
+    current_user: models.user.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Stock reservation and row-lock contention counters of this worker process.
+    """
+    return inventory_metrics.snapshot()
+
+@router.get("/email/outbox")
+def get_email_outbox_stats(
+    db: Session = Depends(deps.get_db),
+    current_user: models.user.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    E-mails waiting for the e-mail worker, sent and given up on.
+    """
+    return email_outbox_repository.stats(db)
+
+@router.get("/socket/metrics")
+def get_socket_metrics(
+    current_user: models.user.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Realtime event counters of this worker process: queued, coalesced, dropped and emitted.
+    """
+    return socket_manager.event_coalescer.snapshot()
+
+@router.get("/db/pool")
+def get_db_pool_metrics(
+    current_user: models.user.User = Depends(deps.get_current_active_superuser),
+) -> Any:
+    """
+    Connection pool checkout wait times and in-use/overflow counts of this worker
+    process, and the measured lag of the read replicas.
+    """
+    return {
+        "sync": sync_pool_metrics.snapshot(engine.pool),
+        "async": async_pool_metrics.snapshot(async_engine.sync_engine.pool),
+        "replicas": replica_router.status(),
+        "replica_pools": [
+            metrics.snapshot(replica.pool) for replica, metrics in zip(replica_engines, replica_pool_metrics)
+        ],
+    }
@@ -1,5 +1,5 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Query
 from sqlalchemy.orm import Session
 from app import schemas, models
 from app.api import deps
@@ -37,15 +37,19 @@ async def upload_brand_logo(
     
     return {"logo_url": f"/static/uploads/brands/{unique_filename}"}
 
-@router.get("/", response_model=List[schemas.brand.Brand])
+@router.get("/", response_model=Union[List[schemas.brand.Brand], schemas.CursorPage[schemas.brand.Brand]])
 def read_brands(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description=schemas.pagination.CURSOR_DESCRIPTION),
 ) -> Any:
     """
     Retrieve brands.
     """
+    if cursor is not None:
+        items, next_cursor = brand_repository.get_page(db, cursor=cursor, limit=limit)
+        return {"items": items, "next_cursor": next_cursor}
     return brand_repository.get_multi(db, skip=skip, limit=limit)
 
 @router.post("/", response_model=schemas.brand.Brand)
@@ -68,7 +72,7 @@ def create_brand(
 @router.get("/{brand_id}", response_model=schemas.brand.Brand)
 def read_brand(
     *,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     brand_id: int,
 ) -> Any:
     """
@@ -1,108 +1,107 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import schemas, models
 from app.api import deps
-from app.repositories.cart_repository import cart_repository
+from app.repositories.cart_repository import async_cart_repository
+from app.repositories.product_repository import async_product_repository
 from app.core import socket_manager # Import
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.cart.CartItem])
-def get_cart(
-    db: Session = Depends(deps.get_db),
-    current_user: models.user.User = Depends(deps.get_current_active_user)
+async def get_cart(
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: models.user.User = Depends(deps.get_current_active_user_async)
 ) -> Any:
     """
     Get current user's cart.
     """
-    return cart_repository.get_by_user(db, user_id=current_user.id)
+    return await async_cart_repository.get_by_user(db, user_id=current_user.id)
 
 @router.post("/", response_model=schemas.cart.CartItem)
 async def add_to_cart(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     cart_in: schemas.cart.CartItemCreate,
-    current_user: models.user.User = Depends(deps.get_current_active_user)
+    current_user: models.user.User = Depends(deps.get_current_active_user_async)
 ) -> Any:
     """
     Add item to cart or update quantity if exists.
     """
-    existing_item = cart_repository.get_by_user_and_product(
-        db, user_id=current_user.id, product_id=cart_in.product_id
+    product = await async_product_repository.get(db, cart_in.product_id)
+    if not product:
+        raise HTTPException(status_code=404, detail="Product not found")
+    item = await async_cart_repository.add_item(
+        db, user_id=current_user.id, product=product, quantity=cart_in.quantity
     )
-    if existing_item:
-        item = cart_repository.update(
-            db, db_obj=existing_item, obj_in={"quantity": existing_item.quantity + cart_in.quantity}
-        )
-        await socket_manager.emit_to_all('cart_updated', {'user_id': current_user.id})
-        return item
-    
-    # Create new item
-    db_obj = models.cart.CartItem(
-        user_id=current_user.id,
-        product_id=cart_in.product_id,
-        quantity=cart_in.quantity
-    )
-    db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
-    await socket_manager.emit_to_all('cart_updated', {'user_id': current_user.id})
-    return db_obj
+    await socket_manager.emit_to_user(current_user.id, 'cart_updated', {'user_id': current_user.id})
+    return item
+
+@router.post("/merge", response_model=List[schemas.cart.CartItem])
+async def merge_cart(
+    *,
+    db: AsyncSession = Depends(deps.get_async_db),
+    items_in: List[schemas.cart.CartItemCreate],
+    current_user: models.user.User = Depends(deps.get_current_active_user_async)
+) -> Any:
+    """
+    Merge a guest cart into the user's cart at login, adding up quantities.
+    """
+    lines = {}
+    for item in items_in:
+        if item.quantity > 0:
+            lines[item.product_id] = lines.get(item.product_id, 0) + item.quantity
+    merged = await async_cart_repository.merge(db, user_id=current_user.id, lines=lines)
+    await socket_manager.emit_to_user(current_user.id, 'cart_updated', {'user_id': current_user.id})
+    return merged
 
 @router.put("/{product_id}", response_model=schemas.cart.CartItem)
 async def update_cart_item(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     product_id: int,
     cart_in: schemas.cart.CartItemUpdate,
-    current_user: models.user.User = Depends(deps.get_current_active_user)
+    current_user: models.user.User = Depends(deps.get_current_active_user_async)
 ) -> Any:
     """
     Update cart item quantity.
     """
-    item = cart_repository.get_by_user_and_product(
+    item = await async_cart_repository.get_by_user_and_product(
         db, user_id=current_user.id, product_id=product_id
     )
     if not item:
         raise HTTPException(status_code=404, detail="Item not found in cart")
     
-    updated_item = cart_repository.update(db, db_obj=item, obj_in=cart_in)
-    await socket_manager.emit_to_all('cart_updated', {'user_id': current_user.id})
+    updated_item = await async_cart_repository.set_quantity(db, line=item, quantity=cart_in.quantity)
+    await socket_manager.emit_to_user(current_user.id, 'cart_updated', {'user_id': current_user.id})
     return updated_item
 
 @router.delete("/{product_id}")
 async def remove_from_cart(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     product_id: int,
-    current_user: models.user.User = Depends(deps.get_current_active_user)
+    current_user: models.user.User = Depends(deps.get_current_active_user_async)
 ) -> Any:
     """
     Remove item from cart.
     """
-    item = cart_repository.get_by_user_and_product(
-        db, user_id=current_user.id, product_id=product_id
-    )
-    if not item:
+    removed = await async_cart_repository.remove_item(db, user_id=current_user.id, product_id=product_id)
+    if not removed:
         raise HTTPException(status_code=404, detail="Item not found in cart")
     
-    db.delete(item)
-    db.commit()
-    await socket_manager.emit_to_all('cart_updated', {'user_id': current_user.id})
+    await socket_manager.emit_to_user(current_user.id, 'cart_updated', {'user_id': current_user.id})
     return {"message": "Item removed from cart"}
 
 @router.delete("/")
 async def clear_cart(
-    db: Session = Depends(deps.get_db),
-    current_user: models.user.User = Depends(deps.get_current_active_user)
+    db: AsyncSession = Depends(deps.get_async_db),
+    current_user: models.user.User = Depends(deps.get_current_active_user_async)
 ) -> Any:
     """
     Clear all items from user's cart.
     """
-    items = cart_repository.get_by_user(db, user_id=current_user.id)
-    for item in items:
-        db.delete(item)
-    db.commit()
-    await socket_manager.emit_to_all('cart_updated', {'user_id': current_user.id})
+    await async_cart_repository.clear(db, user_id=current_user.id)
+    await socket_manager.emit_to_user(current_user.id, 'cart_updated', {'user_id': current_user.id})
     return {"message": "Cart cleared"}
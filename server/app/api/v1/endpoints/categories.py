@@ -39,7 +39,7 @@ async def upload_category_image_generic(
 
 @router.get("/", response_model=List[schemas.category.CategoryWithChildren])
 def read_categories(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
     flat: bool = False,
@@ -90,7 +90,7 @@ def create_category(
 @router.get("/{category_id}", response_model=schemas.category.Category)
 def read_category(
     category_id: int,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
 ) -> Any:
     """
     Get category by ID.
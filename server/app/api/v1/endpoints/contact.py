@@ -1,7 +1,10 @@
 from typing import Any
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends
 from pydantic import BaseModel, EmailStr
-from app.core.email import send_contact_email
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api import deps
+from app.repositories.email_outbox_repository import async_email_outbox_repository
+from app.services.email_service import CONTACT_KIND, contact_payload
 
 router = APIRouter()
 
@@ -11,21 +14,24 @@ class ContactForm(BaseModel):
     phone: str
     message: str
 
-@router.post("/send")
-def send_contact_form(
+@router.post("/send", status_code=202)
+async def send_contact_form(
     *,
+    db: AsyncSession = Depends(deps.get_async_db),
     form_data: ContactForm,
 ) -> Any:
     """
-    Send contact form via email.
+    Queue the contact form for the admin; the e-mail worker delivers it.
     """
-    try:
-        send_contact_email(
+    async_email_outbox_repository.enqueue(
+        db,
+        kind=CONTACT_KIND,
+        payload=contact_payload(
             name=form_data.name,
             email=form_data.email,
             phone=form_data.phone,
             message=form_data.message
-        )
-        return {"message": "Email sent successfully"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to send email: {str(e)}")
+        ),
+    )
+    await db.commit()
+    return {"message": "Email queued for delivery"}
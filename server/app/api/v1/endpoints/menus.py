@@ -1,16 +1,17 @@
 from typing import Any, List
 from fastapi import APIRouter, Depends, HTTPException, Body
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 from app import schemas
 from app.api import deps
-from app.models.menu import Menu, MenuItem
+from app.models.menu import Menu
 from app.models.category import Category
+from app.repositories.menu_repository import menu_repository
 
 router = APIRouter()
 
 @router.get("/", response_model=List[schemas.menu.Menu])
 def read_menus(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
@@ -23,61 +24,16 @@ def read_menus(
 @router.get("/{code}")
 def read_menu_by_code(
     code: str,
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
 ) -> Any:
     """
-    Get a specific menu by its code (e.g., 'main_nav').
-    Returns menu with items, and category data will be fetched separately by frontend if needed.
+    Get a specific menu by its code (e.g., 'main_nav'), with category data
+    (including product counts) embedded in every item.
     """
-    menu = db.query(Menu).filter(Menu.code == code).first()
+    menu = menu_repository.get_payload_by_code(db, code=code)
     if not menu:
         raise HTTPException(status_code=404, detail="Menu not found")
-    
-    # Build response manually to include category data
-    menu_dict = {
-        "id": menu.id,
-        "name": menu.name,
-        "code": menu.code,
-        "is_active": menu.is_active,
-        "created_at": menu.created_at,
-        "updated_at": menu.updated_at,
-        "items": []
-    }
-    
-    for item in menu.items:
-        item_dict = {
-            "id": item.id,
-            "menu_id": item.menu_id,
-            "category_id": item.category_id,
-            "custom_title": item.custom_title,
-            "custom_url": item.custom_url,
-            "sort_order": item.sort_order,
-            "category": None
-        }
-        
-        # Fetch category if exists
-        # Fetch category if exists with product count
-        if item.category_id:
-            category = db.query(Category).filter(Category.id == item.category_id).first()
-            if category:
-                # Get product count for this category
-                from app.models.product import Product
-                from sqlalchemy import func
-                product_count = db.query(func.count(Product.id)).filter(Product.category_id == category.id).scalar()
-                
-                item_dict["category"] = {
-                    "id": category.id,
-                    "name": category.name,
-                    "slug": category.slug,
-                    "description": category.description,
-                    "image_url": category.image_url,
-                    "parent_id": category.parent_id,
-                    "product_count": product_count or 0
-                }
-        
-        menu_dict["items"].append(item_dict)
-    
-    return menu_dict
+    return menu
 
 @router.post("/", response_model=schemas.menu.Menu)
 def create_menu(
@@ -88,14 +44,11 @@ def create_menu(
     """
     Create a new menu.
     """
-    menu = db.query(Menu).filter(Menu.code == menu_in.code).first()
+    menu = menu_repository.get_by_code(db, code=menu_in.code)
     if menu:
         raise HTTPException(status_code=400, detail="Menu with this code already exists")
     
-    menu = Menu(**menu_in.dict())
-    db.add(menu)
-    db.commit()
-    db.refresh(menu)
+    menu = menu_repository.create(db, obj_in=menu_in)
     return menu
 
 @router.put("/{menu_id}", response_model=schemas.menu.Menu)
@@ -108,17 +61,11 @@ def update_menu(
     """
     Update a menu (name, code, active status).
     """
-    menu = db.query(Menu).filter(Menu.id == menu_id).first()
+    menu = menu_repository.get(db, id=menu_id)
     if not menu:
         raise HTTPException(status_code=404, detail="Menu not found")
     
-    update_data = menu_in.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(menu, field, value)
-    
-    db.add(menu)
-    db.commit()
-    db.refresh(menu)
+    menu = menu_repository.update(db, db_obj=menu, obj_in=menu_in)
     return menu
 
 @router.delete("/{menu_id}", response_model=schemas.menu.Menu)
@@ -130,12 +77,11 @@ def delete_menu(
     """
     Delete a menu.
     """
-    menu = db.query(Menu).filter(Menu.id == menu_id).first()
+    menu = menu_repository.get(db, id=menu_id)
     if not menu:
         raise HTTPException(status_code=404, detail="Menu not found")
     
-    db.delete(menu)
-    db.commit()
+    menu = menu_repository.remove(db, id=menu_id)
     return menu
 
 # --- Menu Items Management ---
@@ -150,25 +96,17 @@ def add_menu_items(
     """
     Replace all items in a menu with a new list (useful for reordering and batch updates).
     """
-    menu = db.query(Menu).filter(Menu.id == menu_id).first()
+    menu = menu_repository.get(db, id=menu_id)
     if not menu:
         raise HTTPException(status_code=404, detail="Menu not found")
     
-    # Verify categories exist if provided
-    for item in items_in:
-        if item.category_id:
-            category = db.query(Category).filter(Category.id == item.category_id).first()
-            if not category:
-                 raise HTTPException(status_code=400, detail=f"Category {item.category_id} not found")
+    # Verify categories exist if provided (one query for the whole list)
+    category_ids = {item.category_id for item in items_in if item.category_id}
+    if category_ids:
+        found = {row.id for row in db.query(Category.id).filter(Category.id.in_(category_ids))}
+        missing = sorted(category_ids - found)
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Category {missing[0]} not found")
 
-    # Clear existing items
-    db.query(MenuItem).filter(MenuItem.menu_id == menu_id).delete()
-    
-    # Add new items
-    for item_data in items_in:
-        item = MenuItem(**item_data.dict(), menu_id=menu_id)
-        db.add(item)
-    
-    db.commit()
-    db.refresh(menu)
+    menu = menu_repository.replace_items(db, menu=menu, items_in=items_in)
     return menu
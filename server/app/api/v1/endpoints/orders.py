@@ -1,10 +1,10 @@
 from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from app import schemas
 from app.api import deps
-from app.repositories.order_repository import order_repository, inquiry_repository
-from app.services.email_service import send_new_order_email, send_order_confirmation_email
+from app.repositories.order_repository import async_order_repository, inquiry_repository
 
 router = APIRouter()
 
@@ -15,21 +15,17 @@ from app.api.deps import get_db # Explicit import for clarity if needed
 @router.post("/", response_model=schemas.order.Order)
 async def create_order(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     order_in: schemas.order.OrderCreate,
-    background_tasks: BackgroundTasks,
 ) -> Any:
     """
     Create a new order.
     """
-    order = order_repository.create_order(db, obj_in=order_in)
-    
-    # Send emails in background
-    background_tasks.add_task(send_new_order_email, order)
-    background_tasks.add_task(send_order_confirmation_email, order)
+    # The order e-mails are queued in the same transaction (see app.services.email_worker)
+    order = await async_order_repository.create_order(db, obj_in=order_in)
     
     # Realtime notification
-    # We broadcast minimal info or the full order. 
+    # Administrators get minimal info, not the full order.
     # Since schemas.order.Order is Pydantic, we can use .dict() or .model_dump()
     # But order is an ORM object here. We rely on Pydantic's from_orm usually.
     # We'll construct a simple dict for notification
@@ -39,7 +35,7 @@ async def create_order(
         "total_amount": order.total_amount,
         "status": order.status,
     }
-    await socket_manager.emit_to_all('new_order', notification_data)
+    await socket_manager.emit_to_admins('new_order', notification_data)
 
     return order
 
@@ -1,63 +1,107 @@
-from typing import Any, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from app.models.product import Product
 from app import schemas
 from app.api import deps
-from app.repositories.product_repository import product_repository
+from app.repositories.product_repository import async_product_repository, product_repository
 import json
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.product.Product])
+def parse_spec_filters(specs_json: Optional[str]) -> Optional[dict]:
+    if not specs_json:
+        return None
+    try:
+        return json.loads(specs_json)
+    except json.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Invalid specs_json format")
+
+ProductListResponse = Union[
+    List[schemas.product.Product],
+    schemas.CursorPage[schemas.product.Product],
+    List[schemas.product.ProductSummary],
+    schemas.CursorPage[schemas.product.ProductSummary],
+]
+
+def summary_response(content: Any) -> Response:
+    """
+    Serialize summary rows straight to JSON, skipping response_model validation.
+    """
+    return Response(content=json.dumps(content, ensure_ascii=False), media_type="application/json")
+
+@router.get("/", response_model=ProductListResponse)
 def read_products(
-    db: Session = Depends(deps.get_db),
+    db: Session = Depends(deps.get_read_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description=schemas.pagination.CURSOR_DESCRIPTION),
     q: Optional[str] = None,
     category_id: Optional[int] = Query(None),
     brand_id: Optional[int] = Query(None),
     on_sale: Optional[bool] = Query(None, description="Filter promotional products"),
     specs_json: Optional[str] = Query(None, description="JSON string of tech specs filtering, e.g. {'Material': 'HSS'}"),
+    view: str = Query("full", pattern="^(full|summary)$", description="'summary' returns only the fields of the catalog grid"),
 ) -> Any:
     """
     Retrieve products with optional filtering.
+    When q is given, results are ranked by full-text relevance.
     """
-    spec_filters = None
-    if specs_json:
-        try:
-            spec_filters = json.loads(specs_json)
-        except json.JSONDecodeError:
-            raise HTTPException(status_code=400, detail="Invalid specs_json format")
-    
-    # Build query
-    query = db.query(Product)
-    
-    # Filter by on_sale
-    if on_sale is not None:
-        query = query.filter(Product.on_sale == on_sale)
-    
-    # Filter by category
-    if category_id:
-        query = query.filter(Product.category_id == category_id)
-    
-    # Filter by brand
-    if brand_id:
-        query = query.filter(Product.brand_id == brand_id)
-    
-    # Search by name or SKU
-    if q:
-        query = query.filter(
-            or_(
-                Product.name.ilike(f"%{q}%"),
-                Product.sku.ilike(f"%{q}%")
-            )
+    spec_filters = parse_spec_filters(specs_json)
+    if cursor is not None:
+        if q:
+            raise HTTPException(status_code=400, detail="Cursor pagination is not available for ranked search, use skip/limit")
+        items, next_cursor = product_repository.search_products_page(
+            db,
+            cursor=cursor,
+            limit=limit,
+            category_id=category_id,
+            brand_id=brand_id,
+            on_sale=on_sale,
+            spec_filters=spec_filters,
+            view=view,
         )
-    
-    products = query.offset(skip).limit(limit).all()
+        if view == "summary":
+            return summary_response({"items": [dict(row._mapping) for row in items], "next_cursor": next_cursor})
+        return {"items": items, "next_cursor": next_cursor}
+
+    products = product_repository.search_products(
+        db,
+        query=q,
+        category_id=category_id,
+        brand_id=brand_id,
+        on_sale=on_sale,
+        spec_filters=spec_filters,
+        skip=skip,
+        limit=limit,
+        view=view,
+    )
+    if view == "summary":
+        return summary_response([dict(row._mapping) for row in products])
     return products
 
+@router.get("/facets", response_model=schemas.product.ProductFacets)
+def read_product_facets(
+    db: Session = Depends(deps.get_read_db),
+    q: Optional[str] = None,
+    category_id: Optional[int] = Query(None),
+    brand_id: Optional[int] = Query(None),
+    on_sale: Optional[bool] = Query(None),
+    specs_json: Optional[str] = Query(None, description="Same format as for listing products"),
+) -> Any:
+    """
+    Per-facet value counts (specs, diameter, material, ...) for the current result set,
+    so the filter sidebar renders in one request.
+    """
+    return product_repository.get_facets(
+        db,
+        query=q,
+        category_id=category_id,
+        brand_id=brand_id,
+        on_sale=on_sale,
+        spec_filters=parse_spec_filters(specs_json),
+    )
+
 @router.post("/", response_model=schemas.product.Product)
 def create_product(
     *,
@@ -101,15 +145,15 @@ def create_product(
     return product
 
 @router.get("/{slug}", response_model=schemas.product.Product)
-def read_product_by_slug(
+async def read_product_by_slug(
     *,
-    db: Session = Depends(deps.get_db),
+    db: AsyncSession = Depends(deps.get_async_db),
     slug: str,
 ) -> Any:
     """
     Get product details by slug.
     """
-    product = product_repository.get_by_slug(db, slug=slug)
+    product = await async_product_repository.get_by_slug(db, slug=slug)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
     return product
@@ -1,40 +1,50 @@
+import os
 from typing import Any
-from fastapi import APIRouter, Depends, Response
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app.models.product import Product
-from app.models.category import Category
 from app.api import deps
-from datetime import datetime
+from app.core.config import settings
+from app.services import sitemap_service
+from app.services.sitemap_writer import sitemap_writer
 
 router = APIRouter()
 
+SITEMAPS_URL = f"{settings.SITE_URL}{settings.API_V1_STR}/seo/sitemaps"
+
+def sitemap_index_response(db: Session) -> Any:
+    # Normally served by nginx; fall back to the pre-generated file, then to streaming
+    index_path = sitemap_writer.index_path()
+    if index_path:
+        return FileResponse(index_path, media_type="application/xml")
+    files = sitemap_service.list_sitemaps(db)
+    return StreamingResponse(
+        sitemap_service.iter_sitemap_index(files, SITEMAPS_URL),
+        media_type="application/xml",
+    )
+
 @router.get("/sitemap.xml")
+@router.get("/sitemap_index.xml")
 def get_sitemap(
-    db: Session = Depends(deps.get_db),
-    base_url: str = "https://yourdomain.com" # Should be configurable via env
+    db: Session = Depends(deps.get_read_db),
+) -> Any:
+    """
+    Sitemap index pointing at the gzipped page and product sitemap shards.
+    """
+    return sitemap_index_response(db)
+
+@router.get("/sitemaps/{name}")
+def get_sitemap_file(
+    name: str,
+    db: Session = Depends(deps.get_read_db),
 ) -> Any:
     """
-    Generate a dynamic sitemap.xml
+    Stream one gzipped sitemap file (sitemap-pages.xml.gz or sitemap-products-<n>.xml.gz).
     """
-    products = db.query(Product).all()
-    categories = db.query(Category).all()
-    
-    xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    xml_content += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-    
-    # Static pages
-    static_pages = ["", "/products", "/promotions", "/contact"]
-    for page in static_pages:
-        xml_content += f'  <url>\n    <loc>{base_url}{page}</loc>\n    <changefreq>daily</changefreq>\n    <priority>0.8</priority>\n  </url>\n'
-    
-    # Product pages
-    for p in products:
-        xml_content += f'  <url>\n    <loc>{base_url}/product/{p.slug}</loc>\n    <lastmod>{datetime.now().strftime("%Y-%m-%d")}</lastmod>\n    <changefreq>weekly</changefreq>\n    <priority>0.9</priority>\n  </url>\n'
-        
-    # Category pages
-    for cat in categories:
-        xml_content += f'  <url>\n    <loc>{base_url}/products?category_id={cat.id}</loc>\n    <changefreq>weekly</changefreq>\n    <priority>0.7</priority>\n  </url>\n'
-        
-    xml_content += '</urlset>'
-    
-    return Response(content=xml_content, media_type="application/xml")
+    if name != sitemap_service.PAGES_SITEMAP and sitemap_service.parse_product_shard(name) is None:
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    path = sitemap_writer.path(name)
+    if os.path.exists(path):
+        return FileResponse(path, media_type="application/gzip")
+    chunks = sitemap_service.iter_sitemap(db, name)
+    return StreamingResponse(sitemap_service.gzip_stream(chunks), media_type="application/gzip")
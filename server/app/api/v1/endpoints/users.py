@@ -1,5 +1,5 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Any, List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from app import schemas, models
@@ -8,16 +8,20 @@ from app.repositories.user_repository import user_repository
 
 router = APIRouter()
 
-@router.get("/", response_model=List[schemas.User])
+@router.get("/", response_model=Union[List[schemas.User], schemas.CursorPage[schemas.User]])
 def read_users(
     db: Session = Depends(deps.get_db),
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description=schemas.pagination.CURSOR_DESCRIPTION),
     current_user: models.user.User = Depends(deps.get_current_active_superuser),
 ) -> Any:
     """
     Retrieve users. Admin only.
     """
+    if cursor is not None:
+        items, next_cursor = user_repository.get_page(db, cursor=cursor, limit=limit)
+        return {"items": items, "next_cursor": next_cursor}
     users = user_repository.get_multi(db, skip=skip, limit=limit)
     return users
 
@@ -0,0 +1,45 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from app.core.config import settings
+
+class CatalogCache:
+    """
+    Process-level cache for data derived from the catalog (category tree, menus, ...).
+
+    Repository write methods call invalidate(), which bumps `version` and drops every
+    entry. Entries also expire after `ttl` seconds, which bounds how long another
+    worker process can serve data that was changed through a different worker.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.version = 0
+        self.invalidated_at = float("-inf")  # time.monotonic() of the last invalidate()
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, Any]] = {}
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+            version = self.version
+
+        value = factory()
+
+        with self._lock:
+            # Don't keep a value computed while a write was invalidating the cache
+            if version == self.version:
+                self._entries[key] = (now + self.ttl, value)
+        return value
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self.version += 1
+            self.invalidated_at = time.monotonic()
+            self._entries.clear()
+
+catalog_cache = CatalogCache(ttl=settings.CATALOG_CACHE_TTL)
@@ -20,6 +20,87 @@ class Settings(BaseSettings):
             return v
         return f"postgresql://{values.get('POSTGRES_USER')}:{values.get('POSTGRES_PASSWORD')}@{values.get('POSTGRES_SERVER')}:{values.get('POSTGRES_PORT', '5432')}/{values.get('POSTGRES_DB')}"
 
+    # Same database through asyncpg, for the async session (derived when not set)
+    ASYNC_SQLALCHEMY_DATABASE_URI: Union[str, None] = None
+
+    @validator("ASYNC_SQLALCHEMY_DATABASE_URI", pre=True, always=True)
+    def assemble_async_db_connection(cls, v: Union[str, None], values: dict) -> str:
+        if isinstance(v, str):
+            return v
+        sync_uri = values.get("SQLALCHEMY_DATABASE_URI") or ""
+        for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+            if sync_uri.startswith(prefix):
+                return "postgresql+asyncpg://" + sync_uri[len(prefix):]
+        if sync_uri.startswith("sqlite://"):
+            return "sqlite+aiosqlite://" + sync_uri[len("sqlite://"):]
+        return sync_uri
+
+    # READ REPLICAS for public catalog reads (empty: everything on the primary)
+    SQLALCHEMY_REPLICA_URIS: List[str] = []
+    REPLICA_MAX_LAG: float = 5.0  # Seconds; replicas further behind are skipped
+    REPLICA_LAG_CHECK_INTERVAL: float = 5.0
+    # After a write, the writing client (and this worker's caches) read from the primary
+    READ_YOUR_WRITES_SECONDS: int = 10
+
+    # CONNECTION POOL (per worker process and per engine, see app/db/pool.py)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 10.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Replace connections older than this (seconds, -1: never)
+    # Test every connection with a round-trip on checkout, so a connection dropped by
+    # a database restart or idle timeout is replaced instead of failing a request.
+    # Can be turned off behind PgBouncer, which keeps the server connections alive.
+    DB_POOL_PRE_PING: bool = True
+    # Behind PgBouncer (transaction pooling): no app-side pool, no prepared statements
+    DB_PGBOUNCER: bool = False
+
+    # SEARCH
+    # "postgres": tsvector/GIN full-text search; "memory": in-process inverted index
+    # (for databases without the unaccent/pg_trgm extensions)
+    SEARCH_BACKEND: str = "postgres"
+
+    # Seconds derived catalog data (category tree, menus, ...) may be served from memory
+    CATALOG_CACHE_TTL: int = 60
+    # Seconds between rebuilds of the in-process catalog indexes (facets, memory search),
+    # which bounds how long a worker misses changes written through another (0: never)
+    CATALOG_INDEX_REFRESH_INTERVAL: int = 120
+
+    # HTTP response cache for anonymous GETs of the public catalog endpoints
+    HTTP_CACHE_ENABLED: bool = True
+    HTTP_CACHE_MAX_AGE: int = 60  # Cache-Control max-age sent to browsers/CDNs
+    HTTP_CACHE_MAX_ENTRIES: int = 1024
+
+    # Public URL of the storefront, used for absolute links (sitemaps, ...)
+    SITE_URL: str = "https://tekko.vn"
+
+    # Pre-generated sitemap files (served from /static/sitemaps) and how long the
+    # writer waits after a catalog change before regenerating the affected file
+    SITEMAP_DIR: str = "static/sitemaps"
+    SITEMAP_REBUILD_DELAY: float = 5.0
+    SITEMAP_RETRY_MAX_DELAY: float = 600.0  # Failed rebuilds back off up to this (seconds)
+
+    # CART
+    # "memory": carts held in the worker process (single worker only);
+    # "redis": carts in Redis at REDIS_URL, shared by all workers
+    CART_BACKEND: str = "memory"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    CART_TTL_SECONDS: int = 60 * 60 * 24 * 7  # Dropped from the backend after a week without writes
+    # Changed carts are written to the cart_item table every CART_FLUSH_INTERVAL seconds
+    CART_FLUSH_INTERVAL: float = 5.0
+    CART_FLUSH_BATCH: int = 500
+
+    # SOCKET.IO
+    # Redis URL (redis:// or unix://) relaying events between worker processes;
+    # unset, events only reach the clients connected to the emitting worker
+    SOCKETIO_MESSAGE_QUEUE: Optional[str] = None
+    SOCKETIO_BATCH_WINDOW: float = 0.02  # Seconds emits are collected before publishing
+    SOCKETIO_BATCH_SIZE: int = 100
+    # Events of one type for one room within this window go out as one emit
+    # (0: emit immediately); beyond the limits events are dropped and counted
+    SOCKETIO_COALESCE_WINDOW: float = 0.1
+    SOCKETIO_COALESCE_MAX_PENDING: int = 10000
+    SOCKETIO_COALESCE_MAX_BATCH: int = 100
+
     # MAIL
     MAIL_SERVER: Optional[str] = None
     MAIL_PORT: Optional[int] = None
@@ -27,6 +108,19 @@ class Settings(BaseSettings):
     MAIL_USERNAME: Optional[str] = None
     MAIL_PASSWORD: Optional[str] = None
     MAIL_DEFAULT_SENDER: Optional[str] = None
+    # Recipient of the admin e-mails (new orders, contact form); unset: MAIL_DEFAULT_SENDER
+    MAIL_ADMIN_EMAIL: Optional[str] = None
+
+    # E-MAIL OUTBOX, delivered by `python -m app.services.email_worker`
+    EMAIL_SMTP_POOL_SIZE: int = 2  # SMTP connections kept open (and messages sent in parallel)
+    EMAIL_SMTP_TIMEOUT: float = 30.0
+    EMAIL_WORKER_BATCH: int = 50
+    EMAIL_WORKER_POLL_INTERVAL: float = 2.0  # Seconds between polls when the outbox is empty
+    # Failed sends are retried after EMAIL_RETRY_BASE_DELAY seconds, doubling up to
+    # EMAIL_RETRY_MAX_DELAY, until EMAIL_MAX_ATTEMPTS attempts have been made
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BASE_DELAY: float = 30.0
+    EMAIL_RETRY_MAX_DELAY: float = 3600.0
 
     # BACKEND_CORS_ORIGINS is a JSON-formatted list of strings
     BACKEND_CORS_ORIGINS: List[str] = ["*"]
@@ -0,0 +1,154 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from app.core.cache import catalog_cache
+
+Headers = List[Tuple[bytes, bytes]]
+
+class CachedResponse(NamedTuple):
+    version: int
+    expires_at: float
+    etag: bytes
+    headers: Headers
+    body: bytes
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware caching the serialized bodies of anonymous GET requests to the
+    public catalog endpoints, keyed by path + normalized query string.
+
+    Responses get a strong ETag (hash of the body) and a Cache-Control header, and a
+    matching If-None-Match is answered with 304 before the request reaches FastAPI
+    (no session, no queries). Entries are tied to catalog_cache.version, which the
+    repository write methods bump, and also expire after `ttl` seconds so other
+    worker processes pick up changes made elsewhere.
+    """
+
+    def __init__(
+        self,
+        app,
+        *,
+        path_prefixes: Sequence[str],
+        max_age: int,
+        ttl: float,
+        max_entries: int = 1024,
+    ):
+        self.app = app
+        self.path_prefixes = tuple(path_prefixes)
+        self.cache_control = f"public, max-age={max_age}".encode()
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+
+    def _is_cacheable(self, scope) -> bool:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return False
+        if not scope["path"].startswith(self.path_prefixes):
+            return False
+        # Requests made on behalf of a user are never shared
+        return not any(name == b"authorization" for name, _ in scope["headers"])
+
+    @staticmethod
+    def _cache_key(scope) -> str:
+        query = parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)
+        return f"{scope['path']}?{urlencode(sorted(query))}"
+
+    @staticmethod
+    def _if_none_match(scope) -> Optional[bytes]:
+        for name, value in scope["headers"]:
+            if name == b"if-none-match":
+                return value
+        return None
+
+    @staticmethod
+    def _etag_matches(if_none_match: Optional[bytes], etag: bytes) -> bool:
+        if if_none_match is None:
+            return False
+        candidates = [tag.strip() for tag in if_none_match.split(b",")]
+        return b"*" in candidates or etag in candidates
+
+    def _lookup(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.version != catalog_cache.version or entry.expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: str, entry: CachedResponse) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def _send_entry(self, send, entry: CachedResponse, if_none_match: Optional[bytes], hit: bool) -> None:
+        cache_headers = [
+            (b"etag", entry.etag),
+            (b"cache-control", self.cache_control),
+            (b"x-cache", b"HIT" if hit else b"MISS"),
+        ]
+        if self._etag_matches(if_none_match, entry.etag):
+            await send({"type": "http.response.start", "status": 304, "headers": cache_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers = entry.headers + cache_headers + [(b"content-length", str(len(entry.body)).encode())]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": entry.body})
+
+    async def __call__(self, scope, receive, send):
+        if not self._is_cacheable(scope):
+            await self.app(scope, receive, send)
+            return
+
+        key = self._cache_key(scope)
+        if_none_match = self._if_none_match(scope)
+        entry = self._lookup(key)
+        if entry is not None:
+            await self._send_entry(send, entry, if_none_match, hit=True)
+            return
+
+        version = catalog_cache.version
+        start_message = None
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(scope, receive, capture)
+
+        body = b"".join(chunks)
+        if start_message is None or start_message["status"] != 200:
+            # Errors and redirects pass through untouched and are not cached
+            if start_message is not None:
+                await send(start_message)
+                await send({"type": "http.response.body", "body": body})
+            return
+
+        headers = [
+            (name, value) for name, value in start_message.get("headers", [])
+            if name.lower() not in (b"content-length", b"etag", b"cache-control")
+        ]
+        entry = CachedResponse(
+            version=version,
+            expires_at=time.monotonic() + self.ttl,
+            etag=b'"' + hashlib.sha1(body).hexdigest().encode() + b'"',
+            headers=headers,
+            body=body,
+        )
+        # Don't keep a body rendered while a catalog write was invalidating
+        if version == catalog_cache.version:
+            self._store(key, entry)
+        await self._send_entry(send, entry, if_none_match, hit=False)
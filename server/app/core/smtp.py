@@ -0,0 +1,89 @@
+import asyncio
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from typing import AsyncIterator, List
+
+import aiosmtplib
+
+from app.core.config import settings
+
+class SMTPPool:
+    """
+    Up to `size` logged-in SMTP connections kept open between messages, so
+    sending costs one SMTP transaction instead of connect + STARTTLS + AUTH.
+    A connection that errors is closed instead of going back to the pool; a
+    pooled connection the server dropped while idle is replaced transparently.
+    """
+
+    def __init__(self, *, hostname: str, port: int, username: str, password: str,
+                 start_tls: bool, size: int, timeout: float):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.start_tls = start_tls
+        self.size = size
+        self.timeout = timeout
+        self._idle: List[aiosmtplib.SMTP] = []
+        self._slots = asyncio.Semaphore(size)
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            start_tls=self.start_tls,
+            timeout=self.timeout,
+        )
+        # Connects, upgrades to TLS and logs in
+        await smtp.connect()
+        return smtp
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        async with self._slots:
+            smtp = None
+            while self._idle and smtp is None:
+                smtp = self._idle.pop()
+                if not smtp.is_connected:
+                    smtp = None
+            if smtp is None:
+                smtp = await self._connect()
+            try:
+                yield smtp
+            except Exception:
+                smtp.close()
+                raise
+            self._idle.append(smtp)
+
+    async def send(self, message: EmailMessage) -> None:
+        # A pooled connection can have been closed by the server since its last
+        # use: retry once on a fresh connection
+        for attempt in range(2):
+            try:
+                async with self.connection() as smtp:
+                    await smtp.send_message(message)
+                return
+            except aiosmtplib.SMTPServerDisconnected:
+                if attempt:
+                    raise
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for smtp in idle:
+            try:
+                await smtp.quit()
+            except aiosmtplib.SMTPException:
+                smtp.close()
+
+def create_smtp_pool() -> SMTPPool:
+    return SMTPPool(
+        hostname=settings.MAIL_SERVER,
+        port=settings.MAIL_PORT,
+        username=settings.MAIL_USERNAME,
+        password=settings.MAIL_PASSWORD,
+        start_tls=settings.MAIL_USE_TLS,
+        size=settings.EMAIL_SMTP_POOL_SIZE,
+        timeout=settings.EMAIL_SMTP_TIMEOUT,
+    )
@@ -1,32 +1,225 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+
 import socketio
+from jose import jwt, JWTError
+from pydantic import ValidationError
+
+from app import schemas
+from app.core import security
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+class BatchingRedisManager(socketio.AsyncRedisManager):
+    """
+    Relays emits between worker processes (and hosts) over Redis pub/sub, so an
+    event reaches the clients connected to any worker. Emits published within
+    `batch_window` seconds (or up to `batch_size` of them) travel as one pub/sub
+    message, which keeps bursts (a wave of orders, cart syncs) from turning into
+    one Redis round-trip per event. Other messages (room changes, disconnects)
+    flush the pending emits and go out immediately, so ordering is kept.
+    """
+
+    def __init__(self, url: str, *, batch_window: float, batch_size: int, **kwargs):
+        super().__init__(url, **kwargs)
+        self.batch_window = batch_window
+        self.batch_size = batch_size
+        self._pending: List[dict] = []
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def _publish(self, data):
+        if data.get("method") != "emit":
+            await self._flush()
+            return await super()._publish(data)
+        self._pending.append(data)
+        if len(self._pending) >= self.batch_size:
+            await self._flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        await asyncio.sleep(self.batch_window)
+        self._flush_task = None
+        await self._flush()
+
+    async def _flush(self):
+        batch, self._pending = self._pending, []
+        if batch:
+            await super()._publish({"method": "batch", "messages": batch, "host_id": self.host_id})
+
+    async def _listen(self):
+        async for message in super()._listen():
+            try:
+                data = self.json.loads(message)
+            except (TypeError, ValueError):
+                data = None
+            if isinstance(data, dict) and data.get("method") == "batch":
+                # Each message keeps the sender's host_id, so a worker skips its own
+                for batched in data.get("messages", []):
+                    yield batched
+            else:
+                yield message
+
+def _client_manager() -> Optional[socketio.AsyncManager]:
+    # Without a message queue, events only reach clients of the emitting worker
+    if not settings.SOCKETIO_MESSAGE_QUEUE:
+        return None
+    return BatchingRedisManager(
+        settings.SOCKETIO_MESSAGE_QUEUE,
+        batch_window=settings.SOCKETIO_BATCH_WINDOW,
+        batch_size=settings.SOCKETIO_BATCH_SIZE,
+    )
 
 # Create a Socket.IO server
 # async_mode='asgi' is used for integration with FastAPI (which is ASGI)
 # cors_allowed_origins='*' allows connections from any origin (e.g., your React frontend)
-sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
+sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*', client_manager=_client_manager())
 
 # Create an ASGI application
 # This wraps the Socket.IO server into an ASGI app that can be mounted by FastAPI
 app = socketio.ASGIApp(sio)
 
+ADMIN_ROOM = "admin"
+
+def user_room(user_id: int) -> str:
+    return f"user:{user_id}"
+
+async def _authenticate(auth) -> User:
+    """
+    The active user of the access token the client sent as `auth: {token}`.
+    """
+    token = auth.get("token") if isinstance(auth, dict) else None
+    if not token:
+        raise socketio.exceptions.ConnectionRefusedError("Not authenticated")
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[security.ALGORITHM])
+        token_data = schemas.TokenPayload(**payload)
+    except (JWTError, ValidationError):
+        raise socketio.exceptions.ConnectionRefusedError("Could not validate credentials")
+    if token_data.sub is None:
+        raise socketio.exceptions.ConnectionRefusedError("Could not validate credentials")
+
+    async with AsyncSessionLocal() as db:
+        user = await db.get(User, token_data.sub)
+    if not user or not user.is_active:
+        raise socketio.exceptions.ConnectionRefusedError("Inactive user")
+    return user
+
 @sio.event
-async def connect(sid, environ):
+async def connect(sid, environ, auth=None):
     """
     Handle new client connections.
-    sid: Session ID of the client
-    environ: Request environment details
+    Only authenticated users may connect: each joins its own room, and
+    superusers also join the admin room.
     """
-    print(f"Client connected: {sid}")
+    user = await _authenticate(auth)
+    await sio.save_session(sid, {"user_id": user.id})
+    await sio.enter_room(sid, user_room(user.id))
+    if user.is_superuser:
+        await sio.enter_room(sid, ADMIN_ROOM)
+    logger.info("Client connected: %s (user %s)", sid, user.id)
 
 @sio.event
 async def disconnect(sid):
     """
     Handle client disconnections.
     """
-    print(f"Client disconnected: {sid}")
+    logger.info("Client disconnected: %s", sid)
+
+class EventCoalescer:
+    """
+    Merges the events queued for the same (room, event) within `window` seconds
+    into one emit. For `latest_events` (pure "something changed" signals such as
+    cart_updated) only the last payload is sent; any other event is sent once
+    with the list of its payloads, in order.
+
+    Backpressure: at most `max_pending` (room, event) keys wait for a flush and
+    at most `max_batch` payloads per key; beyond that events are dropped (new
+    keys, or the oldest payload of a full batch) and counted.
+    """
+
+    def __init__(self, emit, *, window: float, max_pending: int, max_batch: int, latest_events: Set[str]):
+        self._emit = emit
+        self.window = window
+        self.max_pending = max_pending
+        self.max_batch = max_batch
+        self.latest_events = latest_events
+        self._pending: Dict[Tuple[str, str], List[dict]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self.queued = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.emitted = 0
+
+    async def push(self, room: str, event: str, data: dict) -> None:
+        if self.window <= 0:
+            await self._emit(event, data if event in self.latest_events else [data], room=room)
+            self.emitted += 1
+            return
+
+        self.queued += 1
+        payloads = self._pending.get((room, event))
+        if payloads is None:
+            if len(self._pending) >= self.max_pending:
+                self.dropped += 1
+                return
+            payloads = self._pending[(room, event)] = []
+        else:
+            self.coalesced += 1
+        if event in self.latest_events:
+            payloads.clear()
+        elif len(payloads) >= self.max_batch:
+            payloads.pop(0)
+            self.dropped += 1
+        payloads.append(data)
+        if self._flush_task is None:
+            self._flush_task = asyncio.get_running_loop().create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self.window)
+        self._flush_task = None
+        await self.flush()
+
+    async def flush(self) -> None:
+        pending, self._pending = self._pending, {}
+        for (room, event), payloads in pending.items():
+            data = payloads[-1] if event in self.latest_events else payloads
+            try:
+                await self._emit(event, data, room=room)
+                self.emitted += 1
+            except Exception:
+                logger.exception("Socket emit of %s to %s failed", event, room)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "queued": self.queued,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "emitted": self.emitted,
+            "pending": len(self._pending),
+        }
+
+event_coalescer = EventCoalescer(
+    sio.emit,
+    window=settings.SOCKETIO_COALESCE_WINDOW,
+    max_pending=settings.SOCKETIO_COALESCE_MAX_PENDING,
+    max_batch=settings.SOCKETIO_COALESCE_MAX_BATCH,
+    latest_events={"cart_updated"},
+)
+
+async def emit_to_user(user_id: int, event: str, data: dict):
+    """
+    Send an event to the connections of one user (all their tabs and devices),
+    coalesced with the user's other events of that type (see EventCoalescer).
+    """
+    await event_coalescer.push(user_room(user_id), event, data)
 
-async def emit_to_all(event: str, data: dict):
+async def emit_to_admins(event: str, data: dict):
     """
-    Helper function to broadcast an event to all connected clients.
+    Send an event to the connected administrators, coalesced like emit_to_user.
     """
-    await sio.emit(event, data)
+    await event_coalescer.push(ADMIN_ROOM, event, data)
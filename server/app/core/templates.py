@@ -0,0 +1,80 @@
+import os
+import re
+from typing import Any, Dict
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from app.core.config import settings
+
+EMAIL_TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "templates", "email")
+
+CSS_RULE = re.compile(r"([^{}]+)\{([^}]*)\}")
+CSS_COMMENT = re.compile(r"/\*.*?\*/", re.S)
+CLASS_ATTR = re.compile(r'class="([^"]*)"')
+
+def parse_css(css: str) -> Dict[str, str]:
+    """
+    Selector -> declarations of a stylesheet made of plain `.class` and `tag` rules.
+    """
+    rules: Dict[str, str] = {}
+    for selectors, declarations in CSS_RULE.findall(CSS_COMMENT.sub("", css)):
+        declarations = "; ".join(d.strip() for d in declarations.split(";") if d.strip())
+        for selector in selectors.split(","):
+            selector = selector.strip()
+            rules[selector] = f"{rules[selector]}; {declarations}" if selector in rules else declarations
+    return rules
+
+def inline_css(html: str, rules: Dict[str, str]) -> str:
+    """
+    Move the stylesheet into style attributes, which is all most mail clients
+    honour: class="a b" becomes the style of .a and .b, and tags with a rule
+    (and no style of their own) get it as their style.
+    """
+    def replace_class(match):
+        styles = [rules[f".{name}"] for name in match.group(1).split() if f".{name}" in rules]
+        return f'style="{"; ".join(styles)}"' if styles else match.group(0)
+
+    html = CLASS_ATTR.sub(replace_class, html)
+    for selector, declarations in rules.items():
+        if selector.isalnum():
+            html = re.sub(rf"<{selector}(?=[\s>])(?![^>]*style=)", f'<{selector} style="{declarations}"', html)
+    return html
+
+class InlineCSSLoader(FileSystemLoader):
+    """
+    Loads templates with the CSS of `stylesheet` already inlined, so the inlining
+    happens once per template at compile time rather than on every render.
+    """
+
+    def __init__(self, searchpath: str, stylesheet: str):
+        super().__init__(searchpath)
+        with open(os.path.join(searchpath, stylesheet), encoding="utf-8") as f:
+            self.rules = parse_css(f.read())
+
+    def get_source(self, environment, template):
+        source, filename, uptodate = super().get_source(environment, template)
+        return inline_css(source, self.rules), filename, uptodate
+
+def format_vnd(value: Any) -> str:
+    return f"{value or 0:,.0f}"
+
+email_templates = Environment(
+    loader=InlineCSSLoader(EMAIL_TEMPLATE_DIR, "email.css"),
+    autoescape=select_autoescape(["html"]),
+    # Compiled templates stay cached for the life of the process
+    auto_reload=False,
+    cache_size=-1,
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+email_templates.filters["vnd"] = format_vnd
+email_templates.globals["project_name"] = settings.PROJECT_NAME
+
+def precompile_email_templates() -> None:
+    for name in email_templates.list_templates(extensions=["html"]):
+        email_templates.get_template(name)
+
+def render_email(name: str, **context: Any) -> str:
+    return email_templates.get_template(name).render(**context)
+
+precompile_email_templates()
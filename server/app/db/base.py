@@ -2,8 +2,9 @@
 # imported by Alembic
 from app.db.base_class import Base  # noqa
 from app.models.user import User  # noqa
-from app.models.category import Category  # noqa
+from app.models.category import Category, CategoryClosure  # noqa
 from app.models.product import Product, ProductSpec, Brand  # noqa
 from app.models.order import Order, OrderItem, ProductInquiry  # noqa
 from app.models.menu import Menu, MenuItem  # noqa
 from app.models.cart import CartItem  # noqa
+from app.models.email_outbox import EmailOutbox  # noqa
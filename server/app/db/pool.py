@@ -0,0 +1,102 @@
+import threading
+import time
+from typing import Any, Dict, Optional, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, Pool, QueuePool
+
+from app.core.config import settings
+
+class PoolMetrics:
+    """
+    Checkout telemetry of one connection pool: how long requests wait for a
+    connection (including the connect itself when the pool has to open one),
+    how often they time out, plus the live in-use/overflow gauges of the pool.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self, pool: Pool) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "pool": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_total_ms": round(self.wait_total * 1000, 3),
+                "wait_avg_ms": round(self.wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0,
+                "wait_max_ms": round(self.wait_max * 1000, 3),
+            }
+        # Gauges only exist on queue pools (not on NullPool)
+        if isinstance(pool, QueuePool):
+            stats.update(
+                size=pool.size(),
+                in_use=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=max(pool.overflow(), 0),
+                max_overflow=pool._max_overflow,
+            )
+        return stats
+
+def instrumented(pool_class: Type[Pool], metrics: PoolMetrics) -> Type[Pool]:
+    """
+    Subclass of pool_class timing every checkout into metrics. The metrics live on
+    the class, so they survive engine.dispose() (which recreates the pool).
+    """
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = pool_class._do_get(self)
+        except exc.TimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+    return type(f"Instrumented{pool_class.__name__}", (pool_class,), {"_do_get": _do_get, "metrics": metrics})
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+def engine_options(*, is_async: bool = False, metrics: Optional[PoolMetrics] = None) -> Dict[str, Any]:
+    """
+    create_engine()/create_async_engine() keyword arguments built from the DB_* settings.
+
+    Every worker process holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections per
+    engine (sync and async), so workers * 2 * (size + overflow) has to stay below
+    the server's max_connections. With DB_PGBOUNCER the pooling is left to PgBouncer:
+    connections are not kept by the app, and asyncpg's prepared statement caches are
+    disabled because a transaction-mode PgBouncer can switch server connections
+    between statements.
+
+    Checkouts are recorded into `metrics`, by default the shared sync/async metrics
+    of the primary; other engines (read replicas) pass their own.
+    """
+    if metrics is None:
+        metrics = async_pool_metrics if is_async else sync_pool_metrics
+    if settings.DB_PGBOUNCER:
+        options: Dict[str, Any] = {"poolclass": instrumented(NullPool, metrics)}
+        if is_async:
+            options["connect_args"] = {"statement_cache_size": 0, "prepared_statement_cache_size": 0}
+        return options
+
+    return {
+        "poolclass": instrumented(AsyncAdaptedQueuePool if is_async else QueuePool, metrics),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
@@ -0,0 +1,68 @@
+from contextlib import contextmanager
+from typing import Iterator, List, Union
+
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from sqlalchemy.orm import Session
+
+Bind = Union[Session, AsyncSession, Engine, AsyncEngine, Connection]
+
+def _engines(bind: Bind) -> List[Engine]:
+    """
+    The engines statements issued through bind can run on: for a session, its
+    primary bind and the read replica it routes reads to (see RoutingSession).
+    """
+    if isinstance(bind, AsyncSession):
+        bind = bind.sync_session
+    if isinstance(bind, Session):
+        engines = _engines(bind.bind)
+        replica = getattr(bind, "replica", None)
+        return engines + _engines(replica) if replica is not None else engines
+    if isinstance(bind, AsyncEngine):
+        return [bind.sync_engine]
+    return [bind.engine if isinstance(bind, Connection) else bind]
+
+class QueryCounter:
+    """
+    Records every SQL statement executed on the engines of the given binds while active.
+
+        with QueryCounter(db) as counter:
+            product_repository.search_products(db, limit=100)
+        assert counter.count <= 2, counter.statements
+    """
+
+    def __init__(self, *binds: Bind):
+        self.engines: List[Engine] = []
+        for bind in binds:
+            for engine in _engines(bind):
+                if engine not in self.engines:
+                    self.engines.append(engine)
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryCounter":
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+
+@contextmanager
+def assert_max_queries(bind: Bind, max_queries: int) -> Iterator[QueryCounter]:
+    """
+    Fail when the block issues more than max_queries statements (catches N+1 regressions).
+    """
+    with QueryCounter(bind) as counter:
+        yield counter
+    if counter.count > max_queries:
+        listing = "\n".join(f"  {i + 1}. {sql}" for i, sql in enumerate(counter.statements))
+        raise AssertionError(f"Expected at most {max_queries} queries, got {counter.count}:\n{listing}")
@@ -0,0 +1,131 @@
+import itertools
+import logging
+import threading
+import time
+from http.cookies import SimpleCookie
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from app.core.cache import catalog_cache
+
+logger = logging.getLogger(__name__)
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything it received
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+class ReplicaRouter:
+    """
+    Picks a read replica for catalog reads, round-robin over the replicas whose
+    measured lag is below max_lag. Lag is re-measured at most every check_interval
+    seconds per replica; a replica that can't be reached counts as lagging.
+    Returns None (use the primary) when no replica qualifies, and for a short
+    while after a catalog write in this process so the caches it refills don't
+    pick up pre-write data.
+    """
+
+    def __init__(self, engines: List[Engine], *, max_lag: float, check_interval: float, write_window: float):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.write_window = write_window
+        self._lock = threading.Lock()
+        self._lag: Dict[int, Tuple[float, float]] = {}  # engine index -> (checked_at, lag)
+        self._next = itertools.cycle(range(len(engines)))
+
+    def lag(self, index: int) -> float:
+        now = time.monotonic()
+        with self._lock:
+            checked = self._lag.get(index)
+            if checked is not None and now - checked[0] < self.check_interval:
+                return checked[1]
+            # Claim the check so concurrent requests keep using the last value
+            self._lag[index] = (now, checked[1] if checked else float("inf"))
+        try:
+            with self.engines[index].connect() as conn:
+                lag = float(conn.execute(REPLICA_LAG_SQL).scalar() or 0)
+        except Exception:
+            logger.warning("Replica %d unreachable, reading from the primary", index, exc_info=True)
+            lag = float("inf")
+        with self._lock:
+            self._lag[index] = (now, lag)
+        return lag
+
+    def choose(self) -> Optional[Engine]:
+        if not self.engines:
+            return None
+        if time.monotonic() - catalog_cache.invalidated_at < self.write_window:
+            return None
+        for _ in range(len(self.engines)):
+            with self._lock:
+                index = next(self._next)
+            if self.lag(index) <= self.max_lag:
+                return self.engines[index]
+        return None
+
+    def status(self) -> List[Dict[str, Optional[float]]]:
+        lags = [self.lag(index) for index in range(len(self.engines))]
+        return [
+            {"replica": index, "lag_seconds": lag if lag != float("inf") else None, "in_use": lag <= self.max_lag}
+            for index, lag in enumerate(lags)
+        ]
+
+class RoutingSession(Session):
+    """
+    Session reading from `replica` (fixed for the whole session, so one request
+    sees one consistent snapshot source). Flushes and INSERT/UPDATE/DELETE
+    statements always go to the primary bind.
+    """
+
+    def __init__(self, *args, replica: Optional[Engine] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.replica is None or self._flushing or isinstance(clause, UpdateBase):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return self.replica
+
+READ_YOUR_WRITES_COOKIE = "rw_until"
+
+def wrote_recently(cookies: Dict[str, str]) -> bool:
+    try:
+        return float(cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+class ReadYourWritesMiddleware:
+    """
+    After a successful write (any non-GET/HEAD/OPTIONS request), set a short-lived
+    cookie telling deps.get_read_db to keep that client on the primary, so an admin
+    sees their own edit even while the replicas are still replaying it.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, app, *, window: int):
+        self.app = app
+        self.window = window
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in self.SAFE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_cookie(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                cookie = SimpleCookie()
+                cookie[READ_YOUR_WRITES_COOKIE] = str(int(time.time()) + self.window)
+                cookie[READ_YOUR_WRITES_COOKIE].update({"max-age": self.window, "path": "/", "httponly": True, "samesite": "Lax"})
+                headers = list(message.get("headers", []))
+                headers.append((b"set-cookie", cookie[READ_YOUR_WRITES_COOKIE].OutputString().encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_cookie)
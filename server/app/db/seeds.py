@@ -4,6 +4,7 @@ from app.models.category import Category
 from app.models.product import Brand, Product, ProductSpec
 from app.models.user import User
 from app.core.security import get_password_hash
+from app.repositories.category_repository import category_repository
 
 def seed_data(db: Session):
     # 1. Create Superuser
@@ -30,6 +31,7 @@ def seed_data(db: Session):
             cat = Category(**cat_data)
             db.add(cat)
             db.flush()
+            category_repository.add_closure_paths(db, category_id=cat.id, parent_id=cat.parent_id)
         cat_objs[cat.slug] = cat
 
     # 3. Create Brands
@@ -1,6 +1,28 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
+from app.db.pool import PoolMetrics, engine_options
+from app.db.replicas import ReplicaRouter, RoutingSession
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, **engine_options())
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Catalog reads (deps.get_read_db) go to a replica chosen by replica_router
+replica_pool_metrics = [PoolMetrics(f"replica-{index}") for index in range(len(settings.SQLALCHEMY_REPLICA_URIS))]
+replica_engines = [
+    create_engine(uri, **engine_options(metrics=metrics))
+    for uri, metrics in zip(settings.SQLALCHEMY_REPLICA_URIS, replica_pool_metrics)
+]
+replica_router = ReplicaRouter(
+    replica_engines,
+    max_lag=settings.REPLICA_MAX_LAG,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL,
+    write_window=settings.READ_YOUR_WRITES_SECONDS,
+)
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
+
+# asyncpg engine for async endpoints. expire_on_commit=False: attributes must stay
+# readable after commit, since an async session cannot lazy-load them again.
+async_engine = create_async_engine(settings.ASYNC_SQLALCHEMY_DATABASE_URI, **engine_options(is_async=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
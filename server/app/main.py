@@ -4,6 +4,8 @@ from fastapi.staticfiles import StaticFiles
 from app.api.v1 import api_router
 from app.core.config import settings
 from app.core.exceptions import info_exception_handler, business_exception_handler, BusinessException
+from app.core.http_cache import ResponseCacheMiddleware
+from app.db.replicas import ReadYourWritesMiddleware
 from app.db import base  # Ensure all models are loaded
 from app.core import socket_manager # Import socket manager
 import socketio # Import socketio library
@@ -19,6 +21,23 @@ fastapi_app = FastAPI(
     version="1.0.0"
 )
 
+# Cache public catalog responses (added before CORS so cached responses still get CORS headers)
+if settings.HTTP_CACHE_ENABLED:
+    fastapi_app.add_middleware(
+        ResponseCacheMiddleware,
+        path_prefixes=[
+            f"{settings.API_V1_STR}/{resource}"
+            for resource in ("products", "categories", "brands", "menus")
+        ],
+        max_age=settings.HTTP_CACHE_MAX_AGE,
+        ttl=settings.CATALOG_CACHE_TTL,
+        max_entries=settings.HTTP_CACHE_MAX_ENTRIES,
+    )
+
+# Keep clients that just wrote something on the primary database
+if settings.SQLALCHEMY_REPLICA_URIS:
+    fastapi_app.add_middleware(ReadYourWritesMiddleware, window=settings.READ_YOUR_WRITES_SECONDS)
+
 # Set all CORS enabled origins
 if settings.BACKEND_CORS_ORIGINS:
     fastapi_app.add_middleware(
@@ -41,6 +60,38 @@ fastapi_app.mount("/static", StaticFiles(directory="static"), name="static")
 fastapi_app.add_exception_handler(Exception, info_exception_handler)
 fastapi_app.add_exception_handler(BusinessException, business_exception_handler)
 
+@fastapi_app.on_event("startup")
+def build_catalog_indexes():
+    from app.db.session import SessionLocal
+    from app.services.facet_index import facet_index
+    from app.services.index_refresher import index_refresher
+    from app.services.search_index import search_index
+    db = SessionLocal()
+    try:
+        facet_index.build(db)
+        if settings.SEARCH_BACKEND == "memory":
+            search_index.build(db)
+    finally:
+        db.close()
+    index_refresher.start(facet_index)
+    if settings.SEARCH_BACKEND == "memory":
+        index_refresher.start(search_index)
+
+@fastapi_app.on_event("startup")
+def start_sitemap_writer():
+    from app.services.sitemap_writer import sitemap_writer
+    sitemap_writer.start()
+
+@fastapi_app.on_event("startup")
+async def start_cart_writer():
+    from app.services.cart_writer import cart_writer
+    cart_writer.start()
+
+@fastapi_app.on_event("shutdown")
+async def stop_cart_writer():
+    from app.services.cart_writer import cart_writer
+    await cart_writer.stop()
+
 @fastapi_app.get("/")
 def root():
     return {"message": "Welcome to Mechanical Electronics Shop API", "docs": "/docs"}
@@ -51,61 +102,11 @@ def root():
 # We need to import 'app' from main in run_server, so we export 'app'.
 app = socketio.ASGIApp(socket_manager.sio, other_asgi_app=fastapi_app)
 
-from fastapi import Response, Depends
+from fastapi import Depends
 from sqlalchemy.orm import Session
 from app.api import deps
-from app.models.product import Product
-from app.models.category import Category
-from datetime import datetime
-
-@fastapi_app.get("/sitemap.xml", response_class=Response)
-def get_sitemap(db: Session = Depends(deps.get_db)):
-    base_url = "https://tekko.vn"
-    
-    # Static routes
-    urls = [
-        {"loc": f"{base_url}/", "changefreq": "daily", "priority": "1.0"},
-        {"loc": f"{base_url}/products", "changefreq": "daily", "priority": "0.8"},
-        {"loc": f"{base_url}/promotions", "changefreq": "daily", "priority": "0.8"},
-        {"loc": f"{base_url}/contact", "changefreq": "monthly", "priority": "0.5"},
-    ]
-
-    # Categories
-    categories = db.query(Category).all()
-    for cat in categories:
-        urls.append({
-            "loc": f"{base_url}/?category_id={cat.id}", # Frontend uses query params for categories currently
-            "changefreq": "weekly",
-            "priority": "0.7"
-        })
-
-    # Products
-    products = db.query(Product).all()
-    for product in products:
-        # Assuming product updated_at exists, else use now, or omit lastmod
-        lastmod = datetime.now().strftime("%Y-%m-%d") 
-        if hasattr(product, 'updated_at') and product.updated_at:
-             lastmod = product.updated_at.strftime("%Y-%m-%d")
-
-        urls.append({
-            "loc": f"{base_url}/product/{product.slug}",
-            "lastmod": lastmod,
-            "changefreq": "weekly",
-            "priority": "0.9"
-        })
-
-    xml_content = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    xml_content += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
-    
-    for url in urls:
-        xml_content += '  <url>\n'
-        xml_content += f'    <loc>{url["loc"]}</loc>\n'
-        if "lastmod" in url:
-            xml_content += f'    <lastmod>{url["lastmod"]}</lastmod>\n'
-        xml_content += f'    <changefreq>{url["changefreq"]}</changefreq>\n'
-        xml_content += f'    <priority>{url["priority"]}</priority>\n'
-        xml_content += '  </url>\n'
-    
-    xml_content += '</urlset>'
-    
-    return Response(content=xml_content, media_type="application/xml")
+from app.api.v1.endpoints import seo
+
+@fastapi_app.get("/sitemap.xml")
+def get_sitemap(db: Session = Depends(deps.get_read_db)):
+    return seo.sitemap_index_response(db)
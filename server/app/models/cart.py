@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, UniqueConstraint
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.base_class import Base
 
 class CartItem(Base):
     __tablename__ = "cart_item"
+    __table_args__ = (
+        # One line per product: adding again increases the quantity
+        UniqueConstraint("user_id", "product_id", name="uq_cart_item_user_product"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
@@ -19,3 +19,15 @@ class Category(Base):
     )
     
     products = relationship("Product", back_populates="category")
+
+class CategoryClosure(Base):
+    """
+    Transitive closure of the category tree: one row per (ancestor, descendant) pair,
+    including each category with itself at depth 0. Lets subtree queries use a plain
+    indexed join instead of recursive queries. Maintained by CategoryRepository.
+    """
+    __tablename__ = "category_closure"
+
+    ancestor_id = Column(Integer, ForeignKey("category.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = Column(Integer, ForeignKey("category.id", ondelete="CASCADE"), primary_key=True, index=True)
+    depth = Column(Integer, nullable=False)
@@ -0,0 +1,32 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text, JSON, Index, text
+from sqlalchemy.sql import func
+from app.db.base_class import Base
+
+class EmailStatus:
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"  # Gave up after EMAIL_MAX_ATTEMPTS
+
+class EmailOutbox(Base):
+    """
+    A transactional e-mail to send, written in the same transaction as the change
+    that causes it and delivered by the e-mail worker (app.services.email_worker).
+    `kind` selects the renderer in app.services.email_service, `payload` holds its
+    arguments (e.g. the order id), so the message is built from current data.
+    """
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(JSON, nullable=False)
+    status = Column(String(20), nullable=False, default=EmailStatus.PENDING)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    sent_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # The worker's queue: pending e-mails that are due
+        Index("ix_email_outbox_pending", "next_attempt_at", postgresql_where=text("status = 'pending'")),
+    )
@@ -1,5 +1,7 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, Text, Boolean
-from sqlalchemy.orm import relationship
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Text, Boolean, DateTime, Index, CheckConstraint
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from app.db.base_class import Base
 
 class Brand(Base):
@@ -19,9 +21,10 @@ class Product(Base):
     description = Column(Text)
     price = Column(Float, nullable=True) # None means "Contact for quote"
     in_stock = Column(Boolean(), default=True)
+    stock_quantity = Column(Integer, nullable=True)  # Units on hand; None means stock is not tracked
     image_url = Column(String, nullable=True)
     
-    category_id = Column(Integer, ForeignKey("category.id"), nullable=False)
+    category_id = Column(Integer, ForeignKey("category.id"), nullable=False, index=True)
     brand_id = Column(Integer, ForeignKey("brand.id"), nullable=False)
     
     # Technical Specifications
@@ -36,11 +39,21 @@ class Product(Base):
     on_sale = Column(Boolean, default=False)
     sale_price = Column(Float, nullable=True)
     created_at = Column(String, nullable=True)  # Using String for simplicity
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=True)  # sitemap lastmod
+    
+    # Full-text search document, maintained by the product_search_vector_trigger (see migrations)
+    search_vector = deferred(Column(TSVECTOR, nullable=True))
     
     category = relationship("Category", back_populates="products")
     brand = relationship("Brand", back_populates="products")
     specs = relationship("ProductSpec", back_populates="product", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_product_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_product_sku_trgm", "sku", postgresql_using="gin", postgresql_ops={"sku": "gin_trgm_ops"}),
+        CheckConstraint("stock_quantity IS NULL OR stock_quantity >= 0", name="ck_product_stock_quantity_non_negative"),
+    )
+
 class ProductSpec(Base):
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey("product.id"))
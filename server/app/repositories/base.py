@@ -1,14 +1,41 @@
-from typing import Any, Generic, List, Optional, Type, TypeVar, Union
+import base64
+import json
+from datetime import datetime
+from typing import Any, Generic, List, Optional, Sequence, Tuple, Type, TypeVar, Union
 from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import DateTime, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
+from app.core.exceptions import BusinessException
 from app.db.base_class import Base
 
 ModelType = TypeVar("ModelType", bound=Base)
 CreateSchemaType = TypeVar("CreateSchemaType", bound=BaseModel)
 UpdateSchemaType = TypeVar("UpdateSchemaType", bound=BaseModel)
 
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps(jsonable_encoder(list(values)), separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(columns, values)
+        ]
+    except (ValueError, TypeError):
+        raise BusinessException("Invalid pagination cursor", status_code=400, code="INVALID_CURSOR")
+
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    # Keyset pagination sort key; the last field must be unique (usually "id")
+    cursor_fields: Tuple[str, ...] = ("id",)
+    cursor_descending: bool = False
+
     def __init__(self, model: Type[ModelType]):
         """
         Base Repository with default methods to Create, Read, Update, Delete (CRUD).
@@ -23,6 +50,39 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     ) -> List[ModelType]:
         return db.query(self.model).offset(skip).limit(limit).all()
 
+    def get_page(
+        self,
+        db: Session,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        query: Optional[Query] = None,
+    ) -> Tuple[List[ModelType], Optional[str]]:
+        """
+        Keyset (cursor) pagination over cursor_fields: seeks past the last row of the
+        previous page instead of using OFFSET, so every page costs the same.
+        Returns the page and the cursor of the next one (None on the last page).
+        """
+        columns = [getattr(self.model, field) for field in self.cursor_fields]
+        db_query = query if query is not None else db.query(self.model)
+
+        if cursor:
+            values = decode_cursor(cursor, columns)
+            if len(columns) == 1:
+                key, bound = columns[0], values[0]
+            else:
+                key, bound = tuple_(*columns), tuple_(*values)
+            db_query = db_query.filter(key < bound if self.cursor_descending else key > bound)
+
+        ordering = [column.desc() if self.cursor_descending else column.asc() for column in columns]
+        items = db_query.order_by(*ordering).limit(limit + 1).all()
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor([getattr(items[-1], field) for field in self.cursor_fields])
+        return items, next_cursor
+
     def create(self, db: Session, *, obj_in: CreateSchemaType) -> ModelType:
         obj_in_data = jsonable_encoder(obj_in)
         db_obj = self.model(**obj_in_data)  # type: ignore
@@ -56,3 +116,55 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         db.delete(obj)
         db.commit()
         return obj
+
+class AsyncBaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
+    """
+    CRUD over an AsyncSession (see app.db.session.AsyncSessionLocal). Relationships
+    are never lazy-loaded in async code, so subclasses eager-load what they return.
+    """
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.get(self.model, id)
+
+    async def get_multi(
+        self, db: AsyncSession, *, skip: int = 0, limit: int = 100
+    ) -> List[ModelType]:
+        result = await db.execute(select(self.model).order_by(self.model.id).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    async def create(self, db: AsyncSession, *, obj_in: CreateSchemaType) -> ModelType:
+        obj_in_data = jsonable_encoder(obj_in)
+        db_obj = self.model(**obj_in_data)  # type: ignore
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(
+        self,
+        db: AsyncSession,
+        *,
+        db_obj: ModelType,
+        obj_in: Union[UpdateSchemaType, dict[str, Any]]
+    ) -> ModelType:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        for field, value in update_data.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
+        obj = await db.get(self.model, id)
+        if obj is not None:
+            await db.delete(obj)
+            await db.commit()
+        return obj
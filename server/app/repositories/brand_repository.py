@@ -1,5 +1,6 @@
-from typing import List, Optional
+from typing import Any, List, Optional, Union
 from sqlalchemy.orm import Session
+from app.core.cache import catalog_cache
 from app.repositories.base import BaseRepository
 from app.models.product import Brand
 from app.schemas.brand import BrandCreate, BrandUpdate
@@ -8,4 +9,25 @@ class BrandRepository(BaseRepository[Brand, BrandCreate, BrandUpdate]):
     def get_by_name(self, db: Session, *, name: str) -> Optional[Brand]:
         return db.query(Brand).filter(Brand.name == name).first()
 
+    def create(self, db: Session, *, obj_in: BrandCreate) -> Brand:
+        brand = super().create(db, obj_in=obj_in)
+        catalog_cache.invalidate()
+        return brand
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Brand,
+        obj_in: Union[BrandUpdate, dict[str, Any]]
+    ) -> Brand:
+        brand = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        catalog_cache.invalidate()
+        return brand
+
+    def remove(self, db: Session, *, id: int) -> Brand:
+        brand = super().remove(db, id=id)
+        catalog_cache.invalidate()
+        return brand
+
 brand_repository = BrandRepository(Brand)
@@ -1,12 +1,35 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from app.repositories.base import BaseRepository
+from typing import Dict, List, NamedTuple, Optional, Type
+from sqlalchemy import delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from app.repositories.base import AsyncBaseRepository, BaseRepository
+from app.repositories.product_repository import async_product_repository, product_loader_options
 from app.models.cart import CartItem
+from app.models.product import Product
 from app.schemas.cart import CartItemCreate, CartItemUpdate
+from app.services.cart_store import CartBackend, cart_backend
+
+def cart_item_upsert(rows: List[Dict[str, int]]):
+    """
+    INSERT ... ON CONFLICT (user_id, product_id) DO UPDATE for cart lines: the
+    quantity of an existing line is replaced. A statement must not contain the
+    same (user_id, product_id) twice.
+    """
+    stmt = pg_insert(CartItem).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=[CartItem.user_id, CartItem.product_id],
+        set_={"quantity": stmt.excluded.quantity, "updated_at": func.now()},
+    )
 
 class CartRepository(BaseRepository[CartItem, CartItemCreate, CartItemUpdate]):
     def get_by_user(self, db: Session, *, user_id: int) -> List[CartItem]:
-        return db.query(CartItem).filter(CartItem.user_id == user_id).all()
+        return (
+            db.query(CartItem)
+            .options(selectinload(CartItem.product).options(*product_loader_options()))
+            .filter(CartItem.user_id == user_id)
+            .all()
+        )
 
     def get_by_user_and_product(self, db: Session, *, user_id: int, product_id: int) -> Optional[CartItem]:
         return db.query(CartItem).filter(
@@ -14,4 +37,116 @@ class CartRepository(BaseRepository[CartItem, CartItemCreate, CartItemUpdate]):
             CartItem.product_id == product_id
         ).first()
 
+class CartLine(NamedTuple):
+    user_id: int
+    product_id: int
+    quantity: int
+    product: Product
+
+class AsyncCartRepository(AsyncBaseRepository[CartItem, CartItemCreate, CartItemUpdate]):
+    """
+    Carts of the async endpoints, served from a CartBackend: reads and writes never
+    touch the cart_item table except to load a cart the backend doesn't hold.
+    persist() writes changed carts back (called by app.services.cart_writer).
+    """
+
+    def __init__(self, model: Type[CartItem], *, backend: CartBackend):
+        super().__init__(model)
+        self.backend = backend
+
+    async def _lines(self, db: AsyncSession, *, user_id: int) -> Dict[int, int]:
+        lines = await self.backend.get(user_id)
+        if lines is not None:
+            return lines
+        result = await db.execute(
+            select(CartItem.product_id, CartItem.quantity).where(CartItem.user_id == user_id).order_by(CartItem.id)
+        )
+        stored: Dict[int, int] = {}
+        for product_id, quantity in result.all():
+            stored[product_id] = stored.get(product_id, 0) + (quantity or 0)
+        return await self.backend.load(user_id, stored)
+
+    async def get_by_user(self, db: AsyncSession, *, user_id: int) -> List[CartLine]:
+        """
+        The cart lines with their products, loaded in one query.
+        """
+        lines = await self._lines(db, user_id=user_id)
+        products = await async_product_repository.get_many_ordered(db, ids=list(lines))
+        return [CartLine(user_id, product.id, lines[product.id], product) for product in products]
+
+    async def get_by_user_and_product(self, db: AsyncSession, *, user_id: int, product_id: int) -> Optional[CartLine]:
+        lines = await self._lines(db, user_id=user_id)
+        if product_id not in lines:
+            return None
+        product = await async_product_repository.get(db, product_id)
+        return CartLine(user_id, product_id, lines[product_id], product) if product else None
+
+    async def add_item(self, db: AsyncSession, *, user_id: int, product: Product, quantity: int) -> CartLine:
+        """
+        Add a product to the cart, or increase the quantity of its existing line.
+        """
+        await self._lines(db, user_id=user_id)
+        total = await self.backend.incr(user_id, product.id, quantity)
+        return CartLine(user_id, product.id, total, product)
+
+    async def merge(self, db: AsyncSession, *, user_id: int, lines: Dict[int, int]) -> List[CartLine]:
+        """
+        Add product_id -> quantity lines (a guest cart at login) to the cart in one
+        backend write. Products that no longer exist are skipped.
+        """
+        products = await async_product_repository.get_many_ordered(db, ids=list(lines))
+        await self._lines(db, user_id=user_id)
+        await self.backend.incr_many(user_id, {product.id: lines[product.id] for product in products})
+        return await self.get_by_user(db, user_id=user_id)
+
+    async def set_quantity(self, db: AsyncSession, *, line: CartLine, quantity: int) -> CartLine:
+        await self.backend.set(line.user_id, line.product_id, quantity)
+        return line._replace(quantity=quantity)
+
+    async def remove_item(self, db: AsyncSession, *, user_id: int, product_id: int) -> bool:
+        await self._lines(db, user_id=user_id)
+        return await self.backend.remove(user_id, product_id)
+
+    async def clear(self, db: AsyncSession, *, user_id: int) -> None:
+        await self.backend.clear(user_id)
+
+    async def persist(self, db: AsyncSession, *, user_ids: List[int]) -> int:
+        """
+        Make the cart_item rows of the given users match their carts in the
+        backend, in one transaction. Lines of products deleted meanwhile are dropped.
+        Returns the number of carts written.
+        """
+        carts = {}
+        for user_id in user_ids:
+            lines = await self.backend.get(user_id)
+            # Expired before it could be written: the table still has the last flush
+            if lines is not None:
+                carts[user_id] = lines
+        if not carts:
+            return 0
+
+        product_ids = {product_id for lines in carts.values() for product_id in lines}
+        result = await db.execute(select(Product.id).where(Product.id.in_(product_ids)))
+        existing = set(result.scalars().all())
+        rows = [
+            {"user_id": user_id, "product_id": product_id, "quantity": quantity}
+            for user_id, lines in carts.items()
+            for product_id, quantity in lines.items()
+            if product_id in existing
+        ]
+        # Lines removed from the carts, then insert or update the others in place
+        await db.execute(
+            delete(CartItem).where(
+                CartItem.user_id.in_(carts.keys()),
+                tuple_(CartItem.user_id, CartItem.product_id).not_in(
+                    [(row["user_id"], row["product_id"]) for row in rows]
+                ),
+            )
+        )
+        if rows:
+            await db.execute(cart_item_upsert(rows))
+        await db.commit()
+        return len(carts)
+
 cart_repository = CartRepository(CartItem)
+async_cart_repository = AsyncCartRepository(CartItem, backend=cart_backend)
@@ -1,46 +1,163 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional, Set, Union
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy.orm import Session, aliased
+from app.core.cache import catalog_cache
+from app.core.exceptions import BusinessException
 from app.repositories.base import BaseRepository
-from app.models.category import Category
+from app.models.category import Category, CategoryClosure
 from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.services.sitemap_writer import sitemap_writer
 
-from sqlalchemy import func
+from sqlalchemy import delete, func, insert, literal, select
 from app.models.product import Product
 
 class CategoryRepository(BaseRepository[Category, CategoryCreate, CategoryUpdate]):
-    def get_root_categories(self, db: Session) -> List[Category]:
-        # Get counts for all categories
-        counts = dict(
-            db.query(Product.category_id, func.count(Product.id))
+    def _build_tree(self, db: Session) -> Dict[str, List[dict]]:
+        """
+        Load every category with its direct product count in one query and assemble
+        the tree in Python. product_count is rolled up to include all descendants.
+        """
+        counts = (
+            db.query(Product.category_id.label("category_id"), func.count(Product.id).label("product_count"))
             .group_by(Product.category_id)
+            .subquery()
+        )
+        rows = (
+            db.query(
+                Category.id, Category.name, Category.slug, Category.description,
+                Category.parent_id, Category.image_url,
+                func.coalesce(counts.c.product_count, 0).label("product_count"),
+            )
+            .outerjoin(counts, counts.c.category_id == Category.id)
+            .order_by(Category.id)
             .all()
         )
-        
-        roots = db.query(Category).filter(Category.parent_id == None).all()
-        
-        # Recursive helper to set product_count
-        def set_counts(cat):
-            cat.product_count = counts.get(cat.id, 0)
-            for child in cat.children:
-                set_counts(child)
-        
+
+        nodes = {row.id: {**row._mapping, "children": []} for row in rows}
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node["parent_id"])
+            if parent is not None:
+                parent["children"].append(node)
+            else:
+                roots.append(node)
+
+        def roll_up(node: dict) -> int:
+            node["product_count"] += sum(roll_up(child) for child in node["children"])
+            return node["product_count"]
+
         for root in roots:
-            set_counts(root)
-            
-        return roots
+            roll_up(root)
 
-    def get_all_flat_with_counts(self, db: Session) -> List[Category]:
-        counts = dict(
-            db.query(Product.category_id, func.count(Product.id))
-            .group_by(Product.category_id)
-            .all()
-        )
-        categories = db.query(Category).all()
-        for cat in categories:
-            cat.product_count = counts.get(cat.id, 0)
-        return categories
+        return {"roots": roots, "flat": list(nodes.values())}
+
+    def _get_tree(self, db: Session) -> Dict[str, List[dict]]:
+        return catalog_cache.get_or_set("category_tree", lambda: self._build_tree(db))
+
+    def get_root_categories(self, db: Session) -> List[dict]:
+        return self._get_tree(db)["roots"]
+
+    def get_all_flat_with_counts(self, db: Session) -> List[dict]:
+        return self._get_tree(db)["flat"]
 
     def get_by_slug(self, db: Session, *, slug: str) -> Optional[Category]:
         return db.query(Category).filter(Category.slug == slug).first()
 
+    def get_subtree_ids(self, db: Session, *, category_id: int) -> Set[int]:
+        """
+        Ids of a category and all of its descendants (one indexed closure lookup).
+        """
+        def load() -> Set[int]:
+            rows = db.query(CategoryClosure.descendant_id).filter(CategoryClosure.ancestor_id == category_id)
+            return {row.descendant_id for row in rows}
+        return catalog_cache.get_or_set(("category_subtree", category_id), load)
+
+    def add_closure_paths(self, db: Session, *, category_id: int, parent_id: Optional[int]) -> None:
+        """
+        Insert the self path of a new category plus one path from each ancestor of its parent.
+        """
+        db.execute(insert(CategoryClosure).values(ancestor_id=category_id, descendant_id=category_id, depth=0))
+        if parent_id is not None:
+            paths = select(
+                CategoryClosure.ancestor_id, literal(category_id), CategoryClosure.depth + 1
+            ).where(CategoryClosure.descendant_id == parent_id)
+            db.execute(insert(CategoryClosure).from_select(["ancestor_id", "descendant_id", "depth"], paths))
+
+    def _move_closure_subtree(self, db: Session, *, category_id: int, new_parent_id: Optional[int]) -> None:
+        """
+        Re-hang the subtree rooted at category_id under new_parent_id: drop the paths from
+        its old ancestors into the subtree, then connect every new ancestor to every
+        subtree node.
+        """
+        subtree_ids = [
+            row.descendant_id for row in
+            db.query(CategoryClosure.descendant_id).filter(CategoryClosure.ancestor_id == category_id)
+        ]
+        if new_parent_id is not None and new_parent_id in subtree_ids:
+            raise BusinessException(
+                "A category cannot be moved under itself or one of its descendants.",
+                status_code=400,
+                code="INVALID_PARENT",
+            )
+
+        old_ancestor_ids = [
+            row.ancestor_id for row in
+            db.query(CategoryClosure.ancestor_id).filter(
+                CategoryClosure.descendant_id == category_id,
+                CategoryClosure.ancestor_id != category_id,
+            )
+        ]
+        if old_ancestor_ids:
+            db.execute(
+                delete(CategoryClosure).where(
+                    CategoryClosure.ancestor_id.in_(old_ancestor_ids),
+                    CategoryClosure.descendant_id.in_(subtree_ids),
+                )
+            )
+
+        if new_parent_id is not None:
+            above = aliased(CategoryClosure)
+            below = aliased(CategoryClosure)
+            paths = select(
+                above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+            ).where(above.descendant_id == new_parent_id, below.ancestor_id == category_id)
+            db.execute(insert(CategoryClosure).from_select(["ancestor_id", "descendant_id", "depth"], paths))
+
+    def create(self, db: Session, *, obj_in: CategoryCreate) -> Category:
+        db_obj = Category(**jsonable_encoder(obj_in))
+        db.add(db_obj)
+        db.flush()
+        self.add_closure_paths(db, category_id=db_obj.id, parent_id=db_obj.parent_id)
+        db.commit()
+        db.refresh(db_obj)
+        sitemap_writer.mark_pages_changed()
+        catalog_cache.invalidate()
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Category,
+        obj_in: Union[CategoryUpdate, dict[str, Any]]
+    ) -> Category:
+        if isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.model_dump(exclude_unset=True)
+        if "parent_id" in update_data and update_data["parent_id"] != db_obj.parent_id:
+            # Runs in the same transaction that BaseRepository.update commits
+            self._move_closure_subtree(db, category_id=db_obj.id, new_parent_id=update_data["parent_id"])
+        db_obj = super().update(db, db_obj=db_obj, obj_in=update_data)
+        sitemap_writer.mark_pages_changed()
+        catalog_cache.invalidate()
+        return db_obj
+
+    def remove(self, db: Session, *, id: int) -> Category:
+        # Closure rows of the removed subtree go away through ON DELETE CASCADE
+        obj = super().remove(db, id=id)
+        sitemap_writer.mark_pages_changed()
+        catalog_cache.invalidate()
+        return obj
+
 category_repository = CategoryRepository(Category)
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.repositories.base import AsyncBaseRepository, BaseRepository
+from app.models.email_outbox import EmailOutbox, EmailStatus
+
+class EmailOutboxRepository(BaseRepository[EmailOutbox, dict, dict]):
+    def enqueue(self, db: Session, *, kind: str, payload: Dict[str, Any]) -> EmailOutbox:
+        """
+        Queue an e-mail in the caller's transaction (no commit): it is sent if and
+        only if the change that caused it is committed.
+        """
+        db_obj = EmailOutbox(kind=kind, payload=payload, status=EmailStatus.PENDING, attempts=0)
+        db.add(db_obj)
+        return db_obj
+
+    def stats(self, db: Session) -> Dict[str, Any]:
+        """
+        Outbox size per status and the age of the oldest pending e-mail.
+        """
+        counts = dict(db.query(EmailOutbox.status, func.count()).group_by(EmailOutbox.status).all())
+        oldest = (
+            db.query(func.min(EmailOutbox.created_at))
+            .filter(EmailOutbox.status == EmailStatus.PENDING)
+            .scalar()
+        )
+        if oldest is not None and oldest.tzinfo is None:
+            oldest = oldest.replace(tzinfo=timezone.utc)
+        return {
+            "pending": counts.get(EmailStatus.PENDING, 0),
+            "sent": counts.get(EmailStatus.SENT, 0),
+            "failed": counts.get(EmailStatus.FAILED, 0),
+            "oldest_pending_seconds": (
+                round((datetime.now(timezone.utc) - oldest).total_seconds(), 1) if oldest else None
+            ),
+        }
+
+class AsyncEmailOutboxRepository(AsyncBaseRepository[EmailOutbox, dict, dict]):
+    def enqueue(self, db: AsyncSession, *, kind: str, payload: Dict[str, Any]) -> EmailOutbox:
+        """
+        Queue an e-mail in the caller's transaction (no commit).
+        """
+        db_obj = EmailOutbox(kind=kind, payload=payload, status=EmailStatus.PENDING, attempts=0)
+        db.add(db_obj)
+        return db_obj
+
+    async def claim_due(self, db: AsyncSession, *, limit: int) -> List[EmailOutbox]:
+        """
+        Lock up to `limit` pending e-mails that are due, oldest first, until the
+        transaction ends. Rows locked by another worker are skipped, so several
+        workers can drain the outbox side by side.
+        """
+        result = await db.execute(
+            select(EmailOutbox)
+            .where(EmailOutbox.status == EmailStatus.PENDING, EmailOutbox.next_attempt_at <= func.now())
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return list(result.scalars().all())
+
+    def mark_sent(self, email: EmailOutbox) -> None:
+        email.status = EmailStatus.SENT
+        email.attempts += 1
+        email.sent_at = datetime.now(timezone.utc)
+        email.last_error = None
+
+    def mark_failed(self, email: EmailOutbox, *, error: str, retry_in: float = None) -> None:
+        """
+        Record a failed attempt: retried after `retry_in` seconds, or given up
+        when retry_in is None.
+        """
+        email.attempts += 1
+        email.last_error = error
+        if retry_in is None:
+            email.status = EmailStatus.FAILED
+        else:
+            email.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=retry_in)
+
+email_outbox_repository = EmailOutboxRepository(EmailOutbox)
+async_email_outbox_repository = AsyncEmailOutboxRepository(EmailOutbox)
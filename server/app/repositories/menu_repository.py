@@ -0,0 +1,96 @@
+from typing import Any, Dict, List, Optional, Union
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from app.core.cache import catalog_cache
+from app.repositories.base import BaseRepository
+from app.models.category import Category, CategoryClosure
+from app.models.menu import Menu, MenuItem
+from app.models.product import Product
+from app.schemas.menu import MenuCreate, MenuItemCreate, MenuUpdate
+
+MENU_FIELDS = ("id", "name", "code", "is_active", "created_at", "updated_at")
+ITEM_FIELDS = ("id", "menu_id", "category_id", "custom_title", "custom_url", "sort_order")
+CATEGORY_FIELDS = ("id", "name", "slug", "description", "image_url", "parent_id")
+
+class MenuRepository(BaseRepository[Menu, MenuCreate, MenuUpdate]):
+    def get_by_code(self, db: Session, *, code: str) -> Optional[Menu]:
+        return db.query(Menu).filter(Menu.code == code).first()
+
+    def _build_payload(self, db: Session, code: str) -> Optional[Dict[str, Any]]:
+        """
+        Load a menu, its items and their categories with one outer-joined query.
+        product_count covers the linked category and all of its descendants.
+        """
+        product_count = (
+            select(func.count(Product.id))
+            .join(CategoryClosure, CategoryClosure.descendant_id == Product.category_id)
+            .where(CategoryClosure.ancestor_id == Category.id)
+            .correlate(Category)
+            .scalar_subquery()
+        )
+        rows = (
+            db.query(
+                *[getattr(Menu, field).label(f"menu_{field}") for field in MENU_FIELDS],
+                *[getattr(MenuItem, field).label(f"item_{field}") for field in ITEM_FIELDS],
+                *[getattr(Category, field).label(f"category_{field}") for field in CATEGORY_FIELDS],
+                product_count.label("category_product_count"),
+            )
+            .outerjoin(MenuItem, MenuItem.menu_id == Menu.id)
+            .outerjoin(Category, Category.id == MenuItem.category_id)
+            .filter(Menu.code == code)
+            .order_by(MenuItem.sort_order, MenuItem.id)
+            .all()
+        )
+        if not rows:
+            return None
+
+        first = rows[0]
+        menu = {field: getattr(first, f"menu_{field}") for field in MENU_FIELDS}
+        menu["items"] = []
+        for row in rows:
+            if row.item_id is None:
+                continue
+            item = {field: getattr(row, f"item_{field}") for field in ITEM_FIELDS}
+            item["category"] = None
+            if row.category_id is not None:
+                item["category"] = {field: getattr(row, f"category_{field}") for field in CATEGORY_FIELDS}
+                item["category"]["product_count"] = row.category_product_count or 0
+            menu["items"].append(item)
+        return menu
+
+    def get_payload_by_code(self, db: Session, *, code: str) -> Optional[Dict[str, Any]]:
+        """
+        Fully built menu (items with category data), cached per code.
+        """
+        return catalog_cache.get_or_set(("menu", code), lambda: self._build_payload(db, code))
+
+    def replace_items(self, db: Session, *, menu: Menu, items_in: List[MenuItemCreate]) -> Menu:
+        db.query(MenuItem).filter(MenuItem.menu_id == menu.id).delete()
+        db.add_all(MenuItem(**item_in.model_dump(), menu_id=menu.id) for item_in in items_in)
+        db.commit()
+        db.refresh(menu)
+        catalog_cache.invalidate()
+        return menu
+
+    def create(self, db: Session, *, obj_in: MenuCreate) -> Menu:
+        menu = super().create(db, obj_in=obj_in)
+        catalog_cache.invalidate()
+        return menu
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Menu,
+        obj_in: Union[MenuUpdate, dict[str, Any]]
+    ) -> Menu:
+        menu = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        catalog_cache.invalidate()
+        return menu
+
+    def remove(self, db: Session, *, id: int) -> Menu:
+        menu = super().remove(db, id=id)
+        catalog_cache.invalidate()
+        return menu
+
+menu_repository = MenuRepository(Menu)
@@ -1,30 +1,75 @@
-from typing import List
-from sqlalchemy.orm import Session
-from app.repositories.base import BaseRepository
-from app.models.order import Order, OrderItem, ProductInquiry
+from typing import Dict, List, Optional
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from app.repositories.base import AsyncBaseRepository, BaseRepository
+from app.repositories.email_outbox_repository import email_outbox_repository
+from app.core.cache import catalog_cache
+from app.models.order import Order, OrderItem, OrderStatus, ProductInquiry
 from app.schemas.order import OrderCreate, ProductInquiryCreate
+from app.services.inventory_service import lock_products, release_stock, reserve_stock
+from app.services.pricing_service import price_order_items
 
 class OrderRepository(BaseRepository[Order, OrderCreate, dict]):
+    # Newest first, matching the admin order list
+    cursor_fields = ("created_at", "id")
+    cursor_descending = True
+
     def create_order(self, db: Session, *, obj_in: OrderCreate, user_id: int = None) -> Order:
+        """
+        Lock the ordered products, price the order server-side and reserve its
+        stock, then insert the order and all of its items (one executemany INSERT)
+        and queue its e-mails in the same transaction.
+        """
+        products = lock_products(db, (item.product_id for item in obj_in.items))
+        priced = price_order_items(db, obj_in.items, products=products)
+        sold_out = reserve_stock(db, ((line.product_id, line.quantity) for line in priced.lines), products)
         db_obj = Order(
             user_id=user_id,
-            total_amount=obj_in.total_amount,
+            total_amount=priced.total_amount,
             shipping_address=obj_in.shipping_address,
             customer_name=obj_in.customer_name,
             customer_phone=obj_in.customer_phone,
             customer_email=obj_in.customer_email
         )
-        
-        # In a real app, we would fetch product prices here to verify total_amount
-        for item_in in obj_in.items:
-            # For simplicity in this scaffold, we'll assume a dummy price
-            # Real implementation would look up the product price
-            db_obj.items.append(OrderItem(
-                product_id=item_in.product_id,
-                quantity=item_in.quantity,
-                price_at_purchase=0.0 # Placeholder
-            ))
-            
+        db.add(db_obj)
+        db.flush()
+
+        db.execute(
+            insert(OrderItem),
+            [
+                {
+                    "order_id": db_obj.id,
+                    "product_id": line.product_id,
+                    "quantity": line.quantity,
+                    "price_at_purchase": line.price_at_purchase,
+                }
+                for line in priced.lines
+            ],
+        )
+        for kind in ("new_order", "order_confirmation"):
+            email_outbox_repository.enqueue(db, kind=kind, payload={"order_id": db_obj.id})
+        db.commit()
+        db.refresh(db_obj)
+        if sold_out:
+            # in_stock flipped, cached catalog pages are out of date
+            catalog_cache.invalidate()
+        return db_obj
+
+    def update_status(self, db: Session, *, db_obj: Order, status: OrderStatus) -> Order:
+        """
+        Change the status of an order. Cancelling gives its stock back; reopening a
+        cancelled order reserves it again.
+        """
+        lines = [(item.product_id, item.quantity) for item in db_obj.items]
+        if status == OrderStatus.CANCELLED and db_obj.status != OrderStatus.CANCELLED:
+            release_stock(db, lines)
+            catalog_cache.invalidate()
+        elif status != OrderStatus.CANCELLED and db_obj.status == OrderStatus.CANCELLED:
+            products = lock_products(db, (product_id for product_id, _ in lines))
+            reserve_stock(db, lines, products)
+            catalog_cache.invalidate()
+        db_obj.status = status
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
@@ -33,5 +78,43 @@ class OrderRepository(BaseRepository[Order, OrderCreate, dict]):
 class InquiryRepository(BaseRepository[ProductInquiry, ProductInquiryCreate, dict]):
     pass
 
+class AsyncOrderRepository(AsyncBaseRepository[Order, OrderCreate, dict]):
+    async def get_with_items(self, db: AsyncSession, *, id: int) -> Optional[Order]:
+        """
+        An order with its items and their products loaded (response and e-mails).
+        """
+        result = await db.execute(
+            select(Order)
+            .options(selectinload(Order.items).selectinload(OrderItem.product))
+            .where(Order.id == id)
+            .execution_options(populate_existing=True)
+        )
+        return result.scalars().first()
+
+    async def get_many_with_items(self, db: AsyncSession, *, ids: List[int]) -> Dict[int, Order]:
+        """
+        Orders by id with their items and products, in three queries whatever
+        the number of orders and lines (e.g. a batch of order e-mails).
+        """
+        if not ids:
+            return {}
+        result = await db.execute(
+            select(Order)
+            .options(selectinload(Order.items).selectinload(OrderItem.product))
+            .where(Order.id.in_(set(ids)))
+        )
+        return {order.id: order for order in result.scalars().all()}
+
+    async def create_order(self, db: AsyncSession, *, obj_in: OrderCreate, user_id: int = None) -> Order:
+        """
+        Runs OrderRepository.create_order (locking, pricing, reservation) on the
+        async connection through run_sync: same transaction logic, no thread.
+        """
+        order = await db.run_sync(
+            lambda session: order_repository.create_order(session, obj_in=obj_in, user_id=user_id)
+        )
+        return await self.get_with_items(db, id=order.id)
+
 order_repository = OrderRepository(Order)
+async_order_repository = AsyncOrderRepository(Order)
 inquiry_repository = InquiryRepository(ProductInquiry)
@@ -1,52 +1,259 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from app.repositories.base import BaseRepository
+from typing import Any, List, Optional, Tuple, Union
+from sqlalchemy import String, and_, func, literal, select, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
+from app.core.cache import catalog_cache
+from app.core.config import settings
+from app.repositories.base import AsyncBaseRepository, BaseRepository
+from app.models.category import CategoryClosure
 from app.models.product import Product, ProductSpec
+from app.repositories.category_repository import category_repository
 from app.schemas.product import ProductCreate, ProductUpdate
+from app.services.search_service import apply_fulltext_search, apply_ilike_search
+from app.services.search_index import search_index
+from app.services.facet_index import FACET_COLUMNS, facet_index
+from app.services.sitemap_writer import sitemap_writer
+
+# Above this many spec-filter matches, filter with SQL semi-joins instead of an id list
+MAX_FACET_ID_FILTER = 10000
+
+def product_loader_options() -> list:
+    """
+    Eager loads for the full schemas.product.Product response: specs in one extra
+    SELECT ... IN per page, category and brand joined into the main query.
+    """
+    return [
+        selectinload(Product.specs),
+        joinedload(Product.category, innerjoin=True),
+        joinedload(Product.brand, innerjoin=True),
+    ]
+
+# Columns of the catalog grid (schemas.product.ProductSummary), fetched as plain rows
+SUMMARY_COLUMNS = (
+    Product.id, Product.name, Product.slug, Product.price, Product.sale_price,
+    Product.on_sale, Product.image_url, Product.in_stock,
+)
 
 class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
+    def _product_query(self, db: Session, view: str = "full") -> Query:
+        """
+        view="full" loads Product entities with their relations for the detailed schema,
+        view="summary" selects only SUMMARY_COLUMNS and returns rows without ORM hydration.
+        """
+        if view == "summary":
+            return db.query(*SUMMARY_COLUMNS)
+        return db.query(Product).options(*product_loader_options())
+
+    def get(self, db: Session, id: Any) -> Optional[Product]:
+        return self._product_query(db).filter(Product.id == id).first()
+
     def get_by_slug(self, db: Session, *, slug: str) -> Optional[Product]:
-        return db.query(Product).filter(Product.slug == slug).first()
+        return self._product_query(db).filter(Product.slug == slug).first()
+
+    def _filtered_query(
+        self,
+        db: Session,
+        db_query: Query,
+        *,
+        query: Optional[str] = None,
+        category_id: Optional[int] = None,
+        brand_id: Optional[int] = None,
+        on_sale: Optional[bool] = None,
+        spec_filters: Optional[dict[str, str]] = None,
+    ) -> Optional[Query]:
+        """
+        Apply the catalog filters to db_query. Returns None when the spec filters
+        already rule out every product, so callers can skip the query entirely.
+        """
+        if query and query.strip():
+            if settings.SEARCH_BACKEND == "postgres" and db.get_bind().dialect.name == "postgresql":
+                db_query = apply_fulltext_search(db_query, query)
+            else:
+                db_query = apply_ilike_search(db_query, query)
+        if on_sale is not None:
+            db_query = db_query.filter(Product.on_sale == on_sale)
+        if category_id:
+            # Whole subtree: "Dao Phay" also lists products of its child categories
+            db_query = db_query.join(
+                CategoryClosure, CategoryClosure.descendant_id == Product.category_id
+            ).filter(CategoryClosure.ancestor_id == category_id)
+        if brand_id:
+            db_query = db_query.filter(Product.brand_id == brand_id)
+
+        if spec_filters:
+            facet_index.ensure_built(db)
+            candidate_ids = facet_index.match(spec_filters)
+            if not candidate_ids:
+                return None
+            if len(candidate_ids) <= MAX_FACET_ID_FILTER:
+                db_query = db_query.filter(Product.id.in_(candidate_ids))
+            else:
+                # Very unselective filters: let the database do the semi-joins instead
+                # of shipping a huge id list
+                for key, value in spec_filters.items():
+                    if key in FACET_COLUMNS:
+                        db_query = db_query.filter(getattr(Product, key) == value)
+                    else:
+                        db_query = db_query.filter(
+                            Product.specs.any(and_(ProductSpec.key == key, ProductSpec.value == value))
+                        )
+        return db_query
+
+    def _search_index_ids(
+        self,
+        db: Session,
+        *,
+        query: str,
+        category_id: Optional[int] = None,
+        brand_id: Optional[int] = None,
+        on_sale: Optional[bool] = None,
+        spec_filters: Optional[dict[str, str]] = None,
+    ) -> List[int]:
+        category_ids = None
+        if category_id:
+            category_ids = category_repository.get_subtree_ids(db, category_id=category_id)
+        product_ids = search_index.search(
+            query, category_ids=category_ids, brand_id=brand_id, on_sale=on_sale
+        )
+        if spec_filters:
+            facet_index.ensure_built(db)
+            candidate_ids = facet_index.match(spec_filters)
+            product_ids = [pid for pid in product_ids if pid in candidate_ids]
+        return product_ids
 
     def search_products(
         self, 
         db: Session, 
         *, 
-        query: str, 
+        query: Optional[str] = None, 
         category_id: Optional[int] = None,
         brand_id: Optional[int] = None,
+        on_sale: Optional[bool] = None,
         spec_filters: Optional[dict[str, str]] = None, # e.g. {"Material": "HSS", "Diameter": "10mm"}
         skip: int = 0, 
-        limit: int = 100
-    ) -> List[Product]:
-        db_query = db.query(Product)
-        if query:
-            db_query = db_query.filter(
-                or_(
-                    Product.name.ilike(f"%{query}%"),
-                    Product.sku.ilike(f"%{query}%"),
-                    Product.description.ilike(f"%{query}%")
-                )
-            )
-        if category_id:
-            db_query = db_query.filter(Product.category_id == category_id)
-        if brand_id:
-            db_query = db_query.filter(Product.brand_id == brand_id)
-            
-        if spec_filters:
-            for key, value in spec_filters.items():
-                db_query = db_query.join(ProductSpec).filter(
-                    ProductSpec.key == key,
-                    ProductSpec.value == value
-                )
-                
+        limit: int = 100,
+        view: str = "full",
+    ) -> List[Any]:
+        filters = dict(
+            category_id=category_id, brand_id=brand_id, on_sale=on_sale, spec_filters=spec_filters
+        )
+        if query and query.strip() and search_index.is_built:
+            product_ids = self._search_index_ids(db, query=query, **filters)
+            return self.get_many_ordered(db, ids=product_ids[skip:skip + limit], view=view)
+
+        db_query = self._filtered_query(db, self._product_query(db, view), query=query, **filters)
+        if db_query is None:
+            return []
         return db_query.offset(skip).limit(limit).all()
 
+    def search_products_page(
+        self,
+        db: Session,
+        *,
+        cursor: Optional[str] = None,
+        limit: int = 100,
+        category_id: Optional[int] = None,
+        brand_id: Optional[int] = None,
+        on_sale: Optional[bool] = None,
+        spec_filters: Optional[dict[str, str]] = None,
+        view: str = "full",
+    ) -> Tuple[List[Any], Optional[str]]:
+        """
+        Keyset-paginated catalog walk in id order (no relevance ranking).
+        """
+        db_query = self._filtered_query(
+            db, self._product_query(db, view),
+            category_id=category_id, brand_id=brand_id, on_sale=on_sale, spec_filters=spec_filters
+        )
+        if db_query is None:
+            return [], None
+        return self.get_page(db, cursor=cursor, limit=limit, query=db_query)
+
+    def get_facets(
+        self,
+        db: Session,
+        *,
+        query: Optional[str] = None,
+        category_id: Optional[int] = None,
+        brand_id: Optional[int] = None,
+        on_sale: Optional[bool] = None,
+        spec_filters: Optional[dict[str, str]] = None,
+    ) -> dict[str, Any]:
+        """
+        Facet value counts for the whole result set of a search (not just one page).
+        Ranked searches count over the ids from the search index; otherwise the
+        counting is done by the database, without loading the matching ids.
+        """
+        filters = dict(
+            category_id=category_id, brand_id=brand_id, on_sale=on_sale, spec_filters=spec_filters
+        )
+        if query and query.strip() and search_index.is_built:
+            facet_index.ensure_built(db)
+            product_ids = self._search_index_ids(db, query=query, **filters)
+            total, counts = len(product_ids), facet_index.counts(product_ids)
+        else:
+            db_query = self._filtered_query(db, db.query(Product.id), query=query, **filters)
+            total, counts = (0, {}) if db_query is None else self._sql_facet_counts(db, db_query)
+
+        return {
+            "total": total,
+            "facets": {
+                key: [{"value": value, "count": count} for value, count in values]
+                for key, values in counts.items()
+            },
+        }
+
+    def _sql_facet_counts(self, db: Session, id_query: Query) -> Tuple[int, dict[str, List[Tuple[str, int]]]]:
+        """
+        Number of products matched by id_query and their per-facet value counts
+        (same facets and order as FacetIndex.counts), in two queries.
+        """
+        matching = id_query.order_by(None).cte("matching_products")
+        total = db.execute(select(func.count()).select_from(matching)).scalar()
+        matching_ids = select(matching.c.id)
+
+        # (facet, value, product) triples; UNION drops a product's duplicate facets
+        parts = [
+            select(literal(name, String).label("key"), column.label("value"), Product.id.label("product_id"))
+            .where(Product.id.in_(matching_ids), column.isnot(None), column != "")
+            for name, column in ((name, getattr(Product, name)) for name in FACET_COLUMNS)
+        ]
+        parts.append(
+            select(ProductSpec.key, ProductSpec.value, ProductSpec.product_id)
+            .where(
+                ProductSpec.product_id.in_(matching_ids),
+                ProductSpec.key.isnot(None), ProductSpec.key != "",
+                ProductSpec.value.isnot(None), ProductSpec.value != "",
+            )
+        )
+        facets = union(*parts).subquery()
+        rows = db.execute(
+            select(facets.c.key, facets.c.value, func.count()).group_by(facets.c.key, facets.c.value)
+        ).all()
+
+        counts: dict[str, List[Tuple[str, int]]] = {}
+        for key, value, count in rows:
+            counts.setdefault(key, []).append((value, count))
+        for values in counts.values():
+            values.sort(key=lambda item: (-item[1], item[0]))
+        return total, counts
+
+    def get_many_ordered(self, db: Session, *, ids: List[int], view: str = "full") -> List[Any]:
+        """
+        Fetch products by primary key, preserving the order of ids.
+        """
+        if not ids:
+            return []
+        products = {p.id: p for p in self._product_query(db, view).filter(Product.id.in_(ids)).all()}
+        return [products[pid] for pid in ids if pid in products]
+
     def create_with_specs(
         self, db: Session, *, obj_in: ProductCreate
     ) -> Product:
         obj_in_data = obj_in.model_dump(exclude={"specs"})
+        if obj_in_data.get("stock_quantity") is not None:
+            # Tracked stock drives the in_stock flag
+            obj_in_data["in_stock"] = obj_in_data["stock_quantity"] > 0
         db_obj = Product(**obj_in_data)
         
         for spec_in in obj_in.specs:
@@ -55,6 +262,59 @@ class ProductRepository(BaseRepository[Product, ProductCreate, ProductUpdate]):
         db.add(db_obj)
         db.commit()
         db.refresh(db_obj)
+        search_index.index_product(db_obj)
+        facet_index.index_product(db_obj)
+        sitemap_writer.mark_product_changed(db_obj.id)
+        catalog_cache.invalidate()
+        return db_obj
+
+    def update(
+        self,
+        db: Session,
+        *,
+        db_obj: Product,
+        obj_in: Union[ProductUpdate, dict[str, Any]]
+    ) -> Product:
+        if not isinstance(obj_in, dict):
+            obj_in = obj_in.model_dump(exclude_unset=True)
+        if obj_in.get("stock_quantity") is not None:
+            # Tracked stock drives the in_stock flag
+            obj_in = {**obj_in, "in_stock": obj_in["stock_quantity"] > 0}
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        search_index.index_product(db_obj)
+        facet_index.index_product(db_obj)
+        sitemap_writer.mark_product_changed(db_obj.id)
+        catalog_cache.invalidate()
         return db_obj
 
+    def remove(self, db: Session, *, id: int) -> Product:
+        obj = super().remove(db, id=id)
+        search_index.remove_product(id)
+        facet_index.remove_product(id)
+        sitemap_writer.mark_product_changed(id)
+        catalog_cache.invalidate()
+        return obj
+
+class AsyncProductRepository(AsyncBaseRepository[Product, ProductCreate, ProductUpdate]):
+    """
+    Read paths of ProductRepository for async endpoints. Filtering, search and
+    writes (which also maintain the in-process indexes) stay on ProductRepository.
+    """
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[Product]:
+        result = await db.execute(select(Product).options(*product_loader_options()).where(Product.id == id))
+        return result.scalars().first()
+
+    async def get_by_slug(self, db: AsyncSession, *, slug: str) -> Optional[Product]:
+        result = await db.execute(select(Product).options(*product_loader_options()).where(Product.slug == slug))
+        return result.scalars().first()
+
+    async def get_many_ordered(self, db: AsyncSession, *, ids: List[int]) -> List[Product]:
+        if not ids:
+            return []
+        result = await db.execute(select(Product).options(*product_loader_options()).where(Product.id.in_(ids)))
+        products = {p.id: p for p in result.scalars().unique().all()}
+        return [products[pid] for pid in ids if pid in products]
+
 product_repository = ProductRepository(Product)
+async_product_repository = AsyncProductRepository(Product)
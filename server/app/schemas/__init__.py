@@ -5,3 +5,4 @@ from .category import Category, CategoryCreate, CategoryUpdate, CategoryWithChil
 from .order import Order, OrderCreate, OrderItem, OrderItemCreate, ProductInquiry, ProductInquiryCreate
 from . import menu
 from .cart import CartItem, CartItemCreate, CartItemUpdate
+from .pagination import CursorPage
@@ -14,9 +14,10 @@ class CartItemUpdate(BaseModel):
     quantity: int
 
 class CartItem(CartItemBase):
-    id: int
+    # Lines served from the cart backend have no cart_item row (yet)
+    id: Optional[int] = None
     user_id: int
-    created_at: datetime
+    created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
     product: Product
 
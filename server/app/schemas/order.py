@@ -25,6 +25,8 @@ class OrderBase(BaseModel):
     customer_email: EmailStr
 
 class OrderCreate(OrderBase):
+    # Ignored: the total is always computed from current product prices
+    total_amount: Optional[float] = None
     items: List[OrderItemCreate]
 
 class Order(OrderBase):
@@ -0,0 +1,13 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+CURSOR_DESCRIPTION = (
+    "Keyset pagination: pass an empty cursor for the first page, then the returned next_cursor. "
+    "Switches the response to {items, next_cursor}."
+)
+
+class CursorPage(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None  # None on the last page
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel
 
 class ProductSpecBase(BaseModel):
@@ -36,6 +36,7 @@ class ProductBase(BaseModel):
     description: Optional[str] = None
     price: Optional[float] = None
     in_stock: bool = True
+    stock_quantity: Optional[int] = None  # None: stock is not tracked
     category_id: int
     brand_id: int
     image_url: Optional[str] = None
@@ -70,3 +71,24 @@ class Product(ProductBase):
     
     class Config:
         from_attributes = True
+
+class ProductSummary(BaseModel):
+    """
+    Catalog grid card (GET /products?view=summary).
+    """
+    id: int
+    name: str
+    slug: str
+    price: Optional[float] = None
+    sale_price: Optional[float] = None
+    on_sale: Optional[bool] = False
+    image_url: Optional[str] = None
+    in_stock: Optional[bool] = True
+
+class FacetValue(BaseModel):
+    value: str
+    count: int
+
+class ProductFacets(BaseModel):
+    total: int
+    facets: Dict[str, List[FacetValue]] = {}
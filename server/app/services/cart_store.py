@@ -0,0 +1,229 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from app.core.config import settings
+
+class CartBackend(ABC):
+    """
+    Where carts live while users work on them: one hash per user mapping
+    product_id -> quantity. Mutations mark the user dirty; app.services.cart_writer
+    persists dirty carts to the cart_item table in the background (write-behind).
+    A cart missing from the backend (never loaded, or expired after `ttl` seconds
+    without writes) is loaded from the table again.
+
+    Subclasses implement every abstract method (instantiating an incomplete
+    backend raises TypeError); expire_stale() is only needed by backends
+    without native key expiry.
+    """
+
+    @abstractmethod
+    async def get(self, user_id: int) -> Optional[Dict[int, int]]:
+        ...
+
+    @abstractmethod
+    async def load(self, user_id: int, lines: Dict[int, int]) -> Dict[int, int]:
+        """
+        Store lines read from the database unless a request got there first;
+        returns the cart as it is now held by the backend.
+        """
+
+    @abstractmethod
+    async def incr(self, user_id: int, product_id: int, quantity: int) -> int:
+        ...
+
+    @abstractmethod
+    async def incr_many(self, user_id: int, lines: Dict[int, int]) -> None:
+        ...
+
+    @abstractmethod
+    async def set(self, user_id: int, product_id: int, quantity: int) -> None:
+        ...
+
+    @abstractmethod
+    async def remove(self, user_id: int, product_id: int) -> bool:
+        ...
+
+    @abstractmethod
+    async def clear(self, user_id: int) -> None:
+        ...
+
+    @abstractmethod
+    async def pop_dirty(self, count: int) -> List[int]:
+        ...
+
+    @abstractmethod
+    async def mark_dirty(self, user_ids: Iterable[int]) -> None:
+        ...
+
+    async def expire_stale(self) -> int:
+        return 0
+
+class MemoryCartBackend(CartBackend):
+    """
+    Carts held in this process. Only correct with a single worker process
+    (development); deployments with several workers use RedisCartBackend.
+    Methods never await, so each one is atomic on the event loop.
+    """
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._carts: Dict[int, Tuple[float, Dict[int, int]]] = {}  # user_id -> (expires_at, lines)
+        self._dirty: Set[int] = set()
+
+    def _lines(self, user_id: int) -> Optional[Dict[int, int]]:
+        entry = self._carts.get(user_id)
+        if entry is None:
+            return None
+        # A dirty cart is kept until it has been persisted
+        if entry[0] <= time.monotonic() and user_id not in self._dirty:
+            del self._carts[user_id]
+            return None
+        return entry[1]
+
+    def _write(self, user_id: int, lines: Dict[int, int]) -> None:
+        self._carts[user_id] = (time.monotonic() + self.ttl, lines)
+        self._dirty.add(user_id)
+
+    async def get(self, user_id: int) -> Optional[Dict[int, int]]:
+        lines = self._lines(user_id)
+        return dict(lines) if lines is not None else None
+
+    async def load(self, user_id: int, lines: Dict[int, int]) -> Dict[int, int]:
+        current = self._lines(user_id)
+        if current is None:
+            current = dict(lines)
+            self._carts[user_id] = (time.monotonic() + self.ttl, current)
+        return dict(current)
+
+    async def incr(self, user_id: int, product_id: int, quantity: int) -> int:
+        lines = self._lines(user_id) or {}
+        lines[product_id] = lines.get(product_id, 0) + quantity
+        self._write(user_id, lines)
+        return lines[product_id]
+
+    async def incr_many(self, user_id: int, lines: Dict[int, int]) -> None:
+        current = self._lines(user_id) or {}
+        for product_id, quantity in lines.items():
+            current[product_id] = current.get(product_id, 0) + quantity
+        self._write(user_id, current)
+
+    async def set(self, user_id: int, product_id: int, quantity: int) -> None:
+        lines = self._lines(user_id) or {}
+        lines[product_id] = quantity
+        self._write(user_id, lines)
+
+    async def remove(self, user_id: int, product_id: int) -> bool:
+        lines = self._lines(user_id) or {}
+        removed = lines.pop(product_id, None) is not None
+        self._write(user_id, lines)
+        return removed
+
+    async def clear(self, user_id: int) -> None:
+        self._write(user_id, {})
+
+    async def pop_dirty(self, count: int) -> List[int]:
+        user_ids = []
+        while self._dirty and len(user_ids) < count:
+            user_ids.append(self._dirty.pop())
+        return user_ids
+
+    async def mark_dirty(self, user_ids: Iterable[int]) -> None:
+        self._dirty.update(user_ids)
+
+    async def expire_stale(self) -> int:
+        now = time.monotonic()
+        stale = [
+            user_id for user_id, (expires_at, _) in self._carts.items()
+            if expires_at <= now and user_id not in self._dirty
+        ]
+        for user_id in stale:
+            del self._carts[user_id]
+        return len(stale)
+
+# Store the database lines only if no request created the cart meanwhile
+REDIS_LOAD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 2))
+end
+redis.call('EXPIRE', KEYS[1], ARGV[1])
+return redis.call('HGETALL', KEYS[1])
+"""
+
+class RedisCartBackend(CartBackend):
+    """
+    Carts in Redis (or any server speaking its protocol), shared by all worker
+    processes: hash cart:{user_id} with a "_" marker field, so an empty cart is
+    told apart from one that isn't loaded, and the dirty users in the set cart:dirty.
+    Keys expire `ttl` seconds after the last write.
+    """
+
+    DIRTY_KEY = "cart:dirty"
+    MARKER = "_"
+
+    def __init__(self, url: str, ttl: int):
+        # Optional dependency, only needed with CART_BACKEND=redis
+        import redis.asyncio as redis
+
+        self.ttl = ttl
+        self.redis = redis.from_url(url, decode_responses=True)
+        self._load = self.redis.register_script(REDIS_LOAD_SCRIPT)
+
+    def _key(self, user_id: int) -> str:
+        return f"cart:{user_id}"
+
+    def _lines(self, data: Dict[str, str]) -> Dict[int, int]:
+        return {int(field): int(value) for field, value in data.items() if field != self.MARKER}
+
+    async def get(self, user_id: int) -> Optional[Dict[int, int]]:
+        data = await self.redis.hgetall(self._key(user_id))
+        return self._lines(data) if data else None
+
+    async def load(self, user_id: int, lines: Dict[int, int]) -> Dict[int, int]:
+        args = [self.ttl, self.MARKER, 1]
+        for product_id, quantity in lines.items():
+            args += [product_id, quantity]
+        flat = await self._load(keys=[self._key(user_id)], args=args)
+        return self._lines(dict(zip(flat[::2], flat[1::2])))
+
+    async def _write(self, user_id: int, *commands) -> list:
+        key = self._key(user_id)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for name, *args in commands:
+                getattr(pipe, name)(key, *args)
+            pipe.hset(key, self.MARKER, 1)
+            pipe.expire(key, self.ttl)
+            pipe.sadd(self.DIRTY_KEY, user_id)
+            return await pipe.execute()
+
+    async def incr(self, user_id: int, product_id: int, quantity: int) -> int:
+        results = await self._write(user_id, ("hincrby", product_id, quantity))
+        return int(results[0])
+
+    async def incr_many(self, user_id: int, lines: Dict[int, int]) -> None:
+        await self._write(user_id, *(("hincrby", product_id, quantity) for product_id, quantity in lines.items()))
+
+    async def set(self, user_id: int, product_id: int, quantity: int) -> None:
+        await self._write(user_id, ("hset", product_id, quantity))
+
+    async def remove(self, user_id: int, product_id: int) -> bool:
+        results = await self._write(user_id, ("hdel", product_id))
+        return results[0] > 0
+
+    async def clear(self, user_id: int) -> None:
+        await self._write(user_id, ("delete",))
+
+    async def pop_dirty(self, count: int) -> List[int]:
+        return [int(user_id) for user_id in await self.redis.spop(self.DIRTY_KEY, count) or []]
+
+    async def mark_dirty(self, user_ids: Iterable[int]) -> None:
+        user_ids = list(user_ids)
+        if user_ids:
+            await self.redis.sadd(self.DIRTY_KEY, *user_ids)
+
+def create_cart_backend() -> CartBackend:
+    if settings.CART_BACKEND == "redis":
+        return RedisCartBackend(settings.REDIS_URL, ttl=settings.CART_TTL_SECONDS)
+    return MemoryCartBackend(ttl=settings.CART_TTL_SECONDS)
+
+cart_backend = create_cart_backend()
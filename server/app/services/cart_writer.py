@@ -0,0 +1,66 @@
+import asyncio
+import logging
+from typing import Optional
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.repositories.cart_repository import async_cart_repository
+from app.services.cart_store import CartBackend, cart_backend
+
+logger = logging.getLogger(__name__)
+
+class CartWriter:
+    """
+    Write-behind for the cart backend: every `interval` seconds the carts changed
+    since the last run are written to the cart_item table, `batch_size` users per
+    transaction, and expired carts are dropped from the backend. A batch that
+    fails is marked dirty again and retried on the next run. With several workers
+    each runs a writer; popping the dirty users is atomic, so they share the work.
+    """
+
+    def __init__(self, backend: CartBackend, interval: float, batch_size: int):
+        self.backend = backend
+        self.interval = interval
+        self.batch_size = batch_size
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Cancel the background task and write out whatever is still pending.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+                await self.backend.expire_stale()
+            except Exception:
+                logger.exception("Cart write-behind failed, retrying")
+
+    async def flush(self) -> int:
+        written = 0
+        while True:
+            user_ids = await self.backend.pop_dirty(self.batch_size)
+            if not user_ids:
+                return written
+            try:
+                async with AsyncSessionLocal() as db:
+                    written += await async_cart_repository.persist(db, user_ids=user_ids)
+            except Exception:
+                await self.backend.mark_dirty(user_ids)
+                raise
+
+cart_writer = CartWriter(
+    backend=cart_backend,
+    interval=settings.CART_FLUSH_INTERVAL,
+    batch_size=settings.CART_FLUSH_BATCH,
+)
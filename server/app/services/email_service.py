@@ -1,9 +1,20 @@
 import logging
+from datetime import datetime
+from email.message import EmailMessage
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
 from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config import settings
+from app.core.templates import render_email
+from app.models.email_outbox import EmailOutbox
+from app.repositories.order_repository import async_order_repository
+
+class EmailContent(NamedTuple):
+    recipient: str
+    subject: str
+    html: str
 
 conf = ConnectionConfig(
     MAIL_USERNAME=settings.MAIL_USERNAME,
@@ -40,84 +51,101 @@ async def send_reset_password_email(email_to: str, email: str, token: str) -> No
     subject = f"{project_name} - Password recovery for user {email}"
     server_host = "http://localhost:8000" # In prod this would be your frontend URL
     link = f"{server_host}/reset-password?token={token}"
-    content = f"""
-        <p>Hello,</p>
-        <p>We received a request to reset your password for {project_name}.</p>
-        <p>Please click on the link below to reset your password:</p>
-        <p><a href="{link}">{link}</a></p>
-        <p>If you didn't request a password reset, please ignore this email.</p>
-    """
     await send_email(
         email_to=email_to,
         subject_template=subject,
-        html_template=content,
+        html_template=render_email("reset_password.html", link=link),
     )
 
-async def send_new_order_email(order: Any) -> None:
+def admin_email() -> Optional[str]:
+    return settings.MAIL_ADMIN_EMAIL or settings.MAIL_DEFAULT_SENDER
+
+def missing_mail_settings() -> List[str]:
     """
-    Send email to admin when a new order is placed.
+    Settings the outbox e-mails cannot be sent without.
     """
-    project_name = settings.PROJECT_NAME
-    subject = f"{project_name} - New Order #{order.id}"
-    email_to = settings.MAIL_DEFAULT_SENDER # Send to admin
-    
-    # Format items list
-    items_html = "<ul>"
-    for item in order.items:
-        # Assuming product relationship is loaded
-        product_name = item.product.name if item.product else "Product"
-        items_html += f"<li>{product_name} - Qty: {item.quantity} - Price: {item.price_at_purchase:,.0f} VND</li>"
-    items_html += "</ul>"
-    
-    content = f"""
-        <h2>New Order Received #{order.id}</h2>
-        <p>You have received a new order from <b>{order.customer_name}</b>.</p>
-        <h3>Customer Details:</h3>
-        <p>
-            Name: {order.customer_name}<br>
-            Phone: {order.customer_phone}<br>
-            Email: {order.customer_email}<br>
-            Address: {order.shipping_address}
-        </p>
-        <h3>Order Items:</h3>
-        {items_html}
-        <p><b>Total Amount: {order.total_amount:,.0f} VND</b></p>
-        <p>Please check the admin panel for more details.</p>
+    missing = [name for name in ("MAIL_SERVER", "MAIL_PORT", "MAIL_DEFAULT_SENDER") if not getattr(settings, name)]
+    if not admin_email():
+        missing.append("MAIL_ADMIN_EMAIL")
+    return missing
+
+def new_order_email(order: Any) -> EmailContent:
     """
-    
-    await send_email(
-        email_to=email_to,
-        subject_template=subject,
-        html_template=content,
-    )
+    Email to admin when a new order is placed.
+    """
+    subject = f"{settings.PROJECT_NAME} - New Order #{order.id}"
+    return EmailContent(admin_email(), subject, render_email("new_order.html", order=order))
 
-async def send_order_confirmation_email(order: Any) -> None:
+def order_confirmation_email(order: Any) -> EmailContent:
     """
-    Send confirmation email to customer.
+    Confirmation email to customer.
     """
-    project_name = settings.PROJECT_NAME
-    subject = f"{project_name} - Order Confirmation #{order.id}"
-    email_to = order.customer_email
-    
-    items_html = "<ul>"
-    for item in order.items:
-        product_name = item.product.name if item.product else "Product"
-        items_html += f"<li>{product_name} - Qty: {item.quantity} - Price: {item.price_at_purchase:,.0f} VND</li>"
-    items_html += "</ul>"
-    
-    content = f"""
-        <h2>Thank you for your order!</h2>
-        <p>Hello {order.customer_name},</p>
-        <p>We have received your order <b>#{order.id}</b> and are processing it.</p>
-        <h3>Order Summary:</h3>
-        {items_html}
-        <p><b>Total: {order.total_amount:,.0f} VND</b></p>
-        <p>We will contact you shortly to confirm delivery details.</p>
-        <p>Best regards,<br>{project_name} Team</p>
+    subject = f"{settings.PROJECT_NAME} - Order Confirmation #{order.id}"
+    return EmailContent(order.customer_email, subject, render_email("order_confirmation.html", order=order))
+
+# Outbox kind of contact form submissions, payload from contact_payload()
+CONTACT_KIND = "contact"
+
+def contact_digest_email(contacts: List[Dict[str, str]]) -> EmailContent:
     """
-    
-    await send_email(
-        email_to=email_to,
-        subject_template=subject,
-        html_template=content,
-    )
+    One email to admin for the contact form submissions (outbox payloads) queued
+    since the last batch.
+    """
+    if len(contacts) == 1:
+        subject = f"[Shop Cơ Khí] Liên hệ mới từ {contacts[0]['name']}"
+    else:
+        subject = f"[Shop Cơ Khí] {len(contacts)} liên hệ mới"
+    return EmailContent(admin_email(), subject, render_email("contact_digest.html", contacts=contacts))
+
+def contact_payload(name: str, email: str, phone: str, message: str) -> Dict[str, str]:
+    return {
+        "name": name,
+        "email": email,
+        "phone": phone,
+        "message": message,
+        "submitted_at": datetime.now().strftime('%d/%m/%Y %H:%M:%S'),
+    }
+
+# Outbox kinds whose payload is {"order_id": ...}
+ORDER_EMAILS: Dict[str, Callable[[Any], EmailContent]] = {
+    "new_order": new_order_email,
+    "order_confirmation": order_confirmation_email,
+}
+
+def to_message(content: EmailContent) -> EmailMessage:
+    message = EmailMessage()
+    message["Subject"] = content.subject
+    message["From"] = settings.MAIL_DEFAULT_SENDER
+    message["To"] = content.recipient
+    message.set_content(content.html, subtype="html")
+    return message
+
+class RenderedEmail(NamedTuple):
+    email: EmailOutbox
+    message: Optional[EmailMessage]  # None when there is nothing to send
+    error: Optional[str] = None  # Why the e-mail could not be rendered
+
+async def render_order_emails(db: AsyncSession, emails: List[EmailOutbox]) -> List[RenderedEmail]:
+    """
+    Build the messages of order outbox e-mails from the current data, loading all
+    their orders (with items and products) up front in a fixed number of queries.
+    Each e-mail is rendered on its own: one that cannot be (unknown kind,
+    template error) gets an error and does not affect the others. The message
+    is None when the order no longer exists.
+    """
+    order_ids = {
+        email.payload["order_id"] for email in emails
+        if email.kind in ORDER_EMAILS and isinstance(email.payload, dict) and "order_id" in email.payload
+    }
+    orders = await async_order_repository.get_many_with_items(db, ids=list(order_ids))
+    rendered = []
+    for email in emails:
+        try:
+            if email.kind not in ORDER_EMAILS:
+                raise ValueError(f"Unknown e-mail kind: {email.kind}")
+            order = orders.get(email.payload["order_id"])
+            rendered.append(RenderedEmail(email, to_message(ORDER_EMAILS[email.kind](order)) if order else None))
+        except Exception as e:
+            logging.exception("Cannot render e-mail %s (%s)", email.id, email.kind)
+            rendered.append(RenderedEmail(email, None, f"Render error: {type(e).__name__}: {e}"))
+    return rendered
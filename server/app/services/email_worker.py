@@ -0,0 +1,193 @@
+"""
+E-mail worker: delivers the e-mails queued in the email_outbox table.
+
+Runs as its own process (`python -m app.services.email_worker`, see
+deployment/ecosystem.config.js), so sending never competes with request
+handling, and queued e-mails survive restarts. Delivery is at-least-once: a
+worker killed between sending and committing sends that batch again.
+"""
+import asyncio
+import logging
+import time
+from email.message import EmailMessage
+from typing import Dict, List, Optional, Tuple
+
+import aiosmtplib
+
+from app.core.config import settings
+from app.core.smtp import SMTPPool, create_smtp_pool
+from app.db import base  # noqa: F401  (all models, for relationship resolution)
+from app.db.session import AsyncSessionLocal
+from app.models.email_outbox import EmailOutbox
+from app.repositories.email_outbox_repository import async_email_outbox_repository
+from app.services.email_service import (
+    CONTACT_KIND, contact_digest_email, missing_mail_settings, render_order_emails, to_message,
+)
+
+logger = logging.getLogger(__name__)
+
+class EmailMetrics:
+    """
+    Delivery counters of this worker, logged every `interval` seconds.
+    """
+
+    def __init__(self, interval: float = 60.0):
+        self.interval = interval
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        self.send_time_total = 0.0
+        self._logged_at = time.monotonic()
+        self._logged_sent = 0
+
+    def record_sent(self, elapsed: float) -> None:
+        self.sent += 1
+        self.send_time_total += elapsed
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed,
+            "send_avg_ms": round(self.send_time_total * 1000 / self.sent, 3) if self.sent else 0.0,
+        }
+
+    def maybe_log(self) -> None:
+        now = time.monotonic()
+        if now - self._logged_at < self.interval:
+            return
+        rate = (self.sent - self._logged_sent) * 60 / (now - self._logged_at)
+        logger.info("E-mail worker: %s, %.1f sent/min", self.snapshot(), rate)
+        self._logged_at, self._logged_sent = now, self.sent
+
+class EmailWorker:
+    """
+    Claims due e-mails in batches, renders them (loading the orders of the whole
+    batch at once), then sends them concurrently over the SMTP pool and records the outcome in
+    the same transaction. The contact form submissions of a batch are sent to
+    the admin as one digest. A failed send is retried with exponential backoff.
+    """
+
+    def __init__(self, pool: SMTPPool, *, batch_size: int, poll_interval: float,
+                 max_attempts: int, retry_base_delay: float, retry_max_delay: float):
+        self.pool = pool
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.metrics = EmailMetrics()
+
+    def retry_delay(self, attempts: int) -> Optional[float]:
+        """
+        Seconds until the next attempt after `attempts` failed ones, None to give up.
+        """
+        if attempts >= self.max_attempts:
+            return None
+        return min(self.retry_base_delay * 2 ** (attempts - 1), self.retry_max_delay)
+
+    async def _send(self, message) -> Optional[str]:
+        """
+        Send one message; returns the error instead of raising, so a bad message
+        never takes down the outcome of the rest of the batch.
+        """
+        started = time.perf_counter()
+        try:
+            await self.pool.send(message)
+        except (aiosmtplib.SMTPException, OSError) as e:
+            return str(e) or type(e).__name__
+        except Exception as e:
+            # e.g. a message without a To/From header
+            logger.exception("Unexpected error sending e-mail")
+            return f"{type(e).__name__}: {e}"
+        self.metrics.record_sent(time.perf_counter() - started)
+        return None
+
+    def _failed(self, email: EmailOutbox, error: str) -> None:
+        retry_in = self.retry_delay(email.attempts + 1)
+        async_email_outbox_repository.mark_failed(email, error=error, retry_in=retry_in)
+        if retry_in is None:
+            self.metrics.failed += 1
+            logger.error("Giving up on e-mail %d (%s) after %d attempts: %s", email.id, email.kind, email.attempts, error)
+        else:
+            self.metrics.retried += 1
+            logger.warning("E-mail %d (%s) failed, retrying in %.0fs: %s", email.id, email.kind, retry_in, error)
+
+    async def run_once(self) -> int:
+        """
+        Deliver one batch; returns the number of e-mails claimed.
+        """
+        async with AsyncSessionLocal() as db:
+            emails = await async_email_outbox_repository.claim_due(db, limit=self.batch_size)
+            if not emails:
+                return 0
+
+            # Contact form submissions go to the admin as one digest per batch
+            contacts = [email for email in emails if email.kind == CONTACT_KIND]
+            ready: List[Tuple[List[EmailOutbox], EmailMessage]] = []
+            if contacts:
+                try:
+                    digest = contact_digest_email([email.payload for email in contacts])
+                    ready.append((contacts, to_message(digest)))
+                except Exception as e:
+                    logger.exception("Cannot render the contact digest")
+                    for email in contacts:
+                        self._failed(email, f"Render error: {type(e).__name__}: {e}")
+
+            orders = [email for email in emails if email.kind != CONTACT_KIND]
+            for email, message, error in await render_order_emails(db, orders):
+                if error is not None:
+                    self._failed(email, error)
+                elif message is None:
+                    async_email_outbox_repository.mark_failed(email, error="Nothing to send: the order no longer exists")
+                    self.metrics.failed += 1
+                else:
+                    ready.append(([email], message))
+
+            errors = await asyncio.gather(*(self._send(message) for _, message in ready), return_exceptions=True)
+            for (sent_emails, _), error in zip(ready, errors):
+                if isinstance(error, BaseException):
+                    error = f"{type(error).__name__}: {error}"
+                for email in sent_emails:
+                    if error is None:
+                        async_email_outbox_repository.mark_sent(email)
+                    else:
+                        self._failed(email, error)
+            await db.commit()
+            return len(emails)
+
+    async def run(self) -> None:
+        logger.info("E-mail worker started (SMTP pool of %d)", self.pool.size)
+        while True:
+            try:
+                claimed = await self.run_once()
+            except Exception:
+                logger.exception("E-mail batch failed")
+                claimed = 0
+            self.metrics.maybe_log()
+            # Keep going while there is a backlog
+            if claimed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+async def main() -> None:
+    # Without them every message fails and is retried until it is given up
+    missing = missing_mail_settings()
+    if missing:
+        raise SystemExit(f"E-mail worker not started, missing settings: {', '.join(missing)}")
+    pool = create_smtp_pool()
+    worker = EmailWorker(
+        pool,
+        batch_size=settings.EMAIL_WORKER_BATCH,
+        poll_interval=settings.EMAIL_WORKER_POLL_INTERVAL,
+        max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+        retry_base_delay=settings.EMAIL_RETRY_BASE_DELAY,
+        retry_max_delay=settings.EMAIL_RETRY_MAX_DELAY,
+    )
+    try:
+        await worker.run()
+    finally:
+        await pool.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    asyncio.run(main())
@@ -0,0 +1,125 @@
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.product import Product, ProductSpec
+
+logger = logging.getLogger(__name__)
+
+# Denormalized spec columns on Product exposed as facets under their column name
+FACET_COLUMNS = ("diameter", "material", "coating", "flutes", "hardness")
+
+Facet = Tuple[str, str]
+
+class FacetIndex:
+    """
+    Precomputed (key, value) -> product ids posting lists over ProductSpec rows and
+    the FACET_COLUMNS of Product. Spec filters are answered by intersecting posting
+    lists in memory, and facet counts by scanning the facets of the result set.
+    Rebuilt periodically by app.services.index_refresher, so changes made through
+    another worker process show up within CATALOG_INDEX_REFRESH_INTERVAL.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[Facet, Set[int]] = {}
+        self._doc_facets: Dict[int, Set[Facet]] = {}
+        self.is_built = False
+
+    def build(self, db: Session) -> None:
+        postings: Dict[Facet, Set[int]] = defaultdict(set)
+        doc_facets: Dict[int, Set[Facet]] = defaultdict(set)
+
+        columns = [getattr(Product, name) for name in FACET_COLUMNS]
+        for row in db.query(Product.id, *columns).yield_per(1000):
+            # Products without any facet still get an (empty) entry
+            facets = doc_facets[row.id]
+            for name in FACET_COLUMNS:
+                value = getattr(row, name)
+                if value:
+                    postings[(name, value)].add(row.id)
+                    facets.add((name, value))
+
+        specs = db.query(ProductSpec.product_id, ProductSpec.key, ProductSpec.value).yield_per(1000)
+        for product_id, key, value in specs:
+            if product_id is not None and key and value:
+                postings[(key, value)].add(product_id)
+                doc_facets[product_id].add((key, value))
+
+        with self._lock:
+            self._postings = dict(postings)
+            self._doc_facets = dict(doc_facets)
+            self.is_built = True
+        logger.info("Facet index built: %d products, %d facet values", len(doc_facets), len(postings))
+
+    def ensure_built(self, db: Session) -> None:
+        if not self.is_built:
+            self.build(db)
+
+    def index_product(self, product: Product) -> None:
+        if not self.is_built:
+            return
+        facets: Set[Facet] = set()
+        for name in FACET_COLUMNS:
+            value = getattr(product, name)
+            if value:
+                facets.add((name, value))
+        for spec in product.specs:
+            if spec.key and spec.value:
+                facets.add((spec.key, spec.value))
+        with self._lock:
+            self._remove(product.id)
+            self._doc_facets[product.id] = facets
+            for facet in facets:
+                self._postings.setdefault(facet, set()).add(product.id)
+
+    def remove_product(self, product_id: int) -> None:
+        if not self.is_built:
+            return
+        with self._lock:
+            self._remove(product_id)
+
+    def _remove(self, product_id: int) -> None:
+        for facet in self._doc_facets.pop(product_id, ()):
+            posting = self._postings.get(facet)
+            if posting is not None:
+                posting.discard(product_id)
+                if not posting:
+                    del self._postings[facet]
+
+    def match(self, filters: Dict[str, str]) -> Set[int]:
+        """
+        Ids of products having every (key, value) pair, intersecting smallest lists first.
+        """
+        with self._lock:
+            postings = [self._postings.get((key, str(value)), set()) for key, value in filters.items()]
+            if not postings:
+                return set(self._doc_facets)
+            postings.sort(key=len)
+            result = set(postings[0])
+            for posting in postings[1:]:
+                result &= posting
+                if not result:
+                    break
+            return result
+
+    def counts(self, product_ids: Iterable[int], keys: Optional[Iterable[str]] = None) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Per-facet value counts over product_ids, most common value first.
+        """
+        wanted = set(keys) if keys is not None else None
+        counter: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        with self._lock:
+            for product_id in product_ids:
+                for key, value in self._doc_facets.get(product_id, ()):
+                    if wanted is None or key in wanted:
+                        counter[key][value] += 1
+        return {
+            key: sorted(values.items(), key=lambda item: (-item[1], item[0]))
+            for key, values in counter.items()
+        }
+
+facet_index = FacetIndex()
@@ -0,0 +1,49 @@
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+class IndexRefresher:
+    """
+    Rebuilds in-process catalog indexes (anything with a build(db) method) from
+    a background thread every `interval` seconds.
+
+    Writes update the indexes of the worker that handled them in place; this
+    bounds how long the other worker processes serve results that miss a
+    change made through a different worker. A rebuild is swapped in atomically,
+    so requests keep using the previous index meanwhile.
+    """
+
+    def __init__(self, interval: float, session_factory: Callable[[], Session] = SessionLocal):
+        self.interval = interval
+        self.session_factory = session_factory
+        self._indexes: List = []
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, *indexes) -> None:
+        self._indexes.extend(indexes)
+        if self._thread is not None or self.interval <= 0:
+            return
+        self._thread = threading.Thread(target=self._run, name="index-refresher", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            for index in list(self._indexes):
+                db = self.session_factory()
+                try:
+                    index.build(db)
+                except Exception:
+                    logger.exception("Rebuilding %s failed, keeping the current one", type(index).__name__)
+                finally:
+                    db.close()
+
+index_refresher = IndexRefresher(interval=settings.CATALOG_INDEX_REFRESH_INTERVAL)
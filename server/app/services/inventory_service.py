@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import BusinessException
+from app.models.product import Product
+
+class InventoryMetrics:
+    """
+    Process-level counters describing how checkouts contend for product rows.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.reservations = 0
+            self.releases = 0
+            self.out_of_stock = 0
+            self.rows_locked = 0
+            self.lock_wait_total = 0.0
+            self.lock_wait_max = 0.0
+
+    def record_lock(self, rows: int, waited: float) -> None:
+        with self._lock:
+            self.rows_locked += rows
+            self.lock_wait_total += waited
+            self.lock_wait_max = max(self.lock_wait_max, waited)
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            locks = self.reservations + self.releases + self.out_of_stock
+            return {
+                "reservations": self.reservations,
+                "releases": self.releases,
+                "out_of_stock": self.out_of_stock,
+                "rows_locked": self.rows_locked,
+                "lock_wait_total_ms": round(self.lock_wait_total * 1000, 3),
+                "lock_wait_avg_ms": round(self.lock_wait_total * 1000 / locks, 3) if locks else 0.0,
+                "lock_wait_max_ms": round(self.lock_wait_max * 1000, 3),
+            }
+
+inventory_metrics = InventoryMetrics()
+
+def _sum_quantities(lines: Iterable[Tuple[int, int]]) -> Dict[int, int]:
+    quantities: Dict[int, int] = defaultdict(int)
+    for product_id, quantity in lines:
+        quantities[product_id] += quantity
+    return dict(quantities)
+
+def lock_products(db: Session, product_ids: Iterable[int]) -> Dict[int, Product]:
+    """
+    SELECT ... FOR UPDATE the given products in ascending id order. Every checkout
+    takes its locks in the same order, so two orders sharing products queue up on
+    the first common row instead of deadlocking. The lock is held until commit.
+    """
+    started = time.perf_counter()
+    rows = (
+        db.query(Product.id, Product.price, Product.on_sale, Product.sale_price, Product.stock_quantity)
+        .filter(Product.id.in_(set(product_ids)))
+        .order_by(Product.id)
+        .with_for_update(of=Product)
+        .all()
+    )
+    inventory_metrics.record_lock(len(rows), time.perf_counter() - started)
+    return {row.id: row for row in rows}
+
+def _apply_stock_delta(db: Session, deltas: Dict[int, int]) -> None:
+    """
+    One UPDATE for every tracked product: stock_quantity += delta, keeping the
+    in_stock flag in line with the remaining quantity.
+    """
+    if not deltas:
+        return
+    delta = case(deltas, value=Product.id, else_=0)
+    db.execute(
+        update(Product)
+        .where(Product.id.in_(deltas.keys()), Product.stock_quantity.isnot(None))
+        .values(
+            stock_quantity=Product.stock_quantity + delta,
+            in_stock=Product.stock_quantity + delta > 0,
+            # Stock movements are not content changes (updated_at feeds sitemap lastmod)
+            updated_at=Product.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+def reserve_stock(db: Session, lines: Iterable[Tuple[int, int]], products: Dict[int, Product]) -> List[int]:
+    """
+    Take (product_id, quantity) lines out of stock. `products` must come from
+    lock_products() in the same transaction. Products with stock_quantity NULL are
+    not tracked and always available. Returns the ids of products that sold out.
+    """
+    quantities = _sum_quantities(lines)
+    tracked = {
+        product_id: quantity for product_id, quantity in quantities.items()
+        if product_id in products and products[product_id].stock_quantity is not None
+    }
+    short = sorted(
+        product_id for product_id, quantity in tracked.items()
+        if products[product_id].stock_quantity < quantity
+    )
+    if short:
+        inventory_metrics.incr("out_of_stock")
+        raise BusinessException(
+            f"Not enough stock for products: {', '.join(map(str, short))}", status_code=409, code="OUT_OF_STOCK"
+        )
+
+    _apply_stock_delta(db, {product_id: -quantity for product_id, quantity in tracked.items()})
+    inventory_metrics.incr("reservations")
+    return [
+        product_id for product_id, quantity in tracked.items()
+        if products[product_id].stock_quantity == quantity
+    ]
+
+def release_stock(db: Session, lines: Iterable[Tuple[int, int]]) -> None:
+    """
+    Put (product_id, quantity) lines back into stock, e.g. when an order is cancelled.
+    """
+    quantities = _sum_quantities(lines)
+    lock_products(db, quantities.keys())
+    _apply_stock_delta(db, quantities)
+    inventory_metrics.incr("releases")
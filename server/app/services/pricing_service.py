@@ -0,0 +1,69 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.exceptions import BusinessException
+from app.models.product import Product
+from app.schemas.order import OrderItemCreate
+
+class PricedLine(NamedTuple):
+    product_id: int
+    quantity: int
+    unit_price: Optional[float]  # None: "contact for quote"
+
+    @property
+    def price_at_purchase(self) -> float:
+        # Quote items are stored at 0 and priced by the shop afterwards
+        return self.unit_price if self.unit_price is not None else 0.0
+
+class PricedOrder(NamedTuple):
+    lines: List[PricedLine]
+    total_amount: float
+
+def unit_price(price: Optional[float], on_sale: Optional[bool], sale_price: Optional[float]) -> Optional[float]:
+    """
+    Price a customer pays for one unit: the sale price while a promotion is on,
+    otherwise the list price (None when the product is "contact for quote").
+    """
+    if on_sale and sale_price is not None:
+        return sale_price
+    return price
+
+def price_order_items(db: Session, items: Iterable[OrderItemCreate], *, products: Optional[Dict[int, Any]] = None) -> PricedOrder:
+    """
+    Price every line of an order with one IN query over the products involved,
+    or from `products` when the caller already loaded (and locked) the rows.
+    Client-side totals are never trusted.
+    """
+    items = list(items)
+    if not items:
+        raise BusinessException("An order needs at least one item.", status_code=400, code="EMPTY_ORDER")
+    for item in items:
+        if item.quantity < 1:
+            raise BusinessException(
+                f"Invalid quantity for product {item.product_id}.", status_code=400, code="INVALID_QUANTITY"
+            )
+
+    if products is None:
+        rows = (
+            db.query(Product.id, Product.price, Product.on_sale, Product.sale_price)
+            .filter(Product.id.in_({item.product_id for item in items}))
+            .all()
+        )
+        products = {row.id: row for row in rows}
+
+    missing = sorted({item.product_id for item in items} - products.keys())
+    if missing:
+        raise BusinessException(
+            f"Products not found: {', '.join(map(str, missing))}", status_code=400, code="PRODUCT_NOT_FOUND"
+        )
+
+    lines = []
+    total_amount = 0.0
+    for item in items:
+        product = products[item.product_id]
+        price = unit_price(product.price, product.on_sale, product.sale_price)
+        lines.append(PricedLine(item.product_id, item.quantity, price))
+        if price is not None:
+            total_amount += price * item.quantity
+    return PricedOrder(lines, total_amount)
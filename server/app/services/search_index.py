@@ -0,0 +1,185 @@
+import bisect
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.models.product import Product, ProductSpec
+from app.services.search_service import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Field weights used for ranking (higher wins)
+NAME_WEIGHT = 3.0
+SKU_WEIGHT = 3.0
+SPEC_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+
+# Prefix matches ("khoa" -> "khoan") rank below whole-word matches
+PREFIX_PENALTY = 0.5
+
+class DocMeta(NamedTuple):
+    category_id: Optional[int]
+    brand_id: Optional[int]
+    on_sale: bool
+
+class ProductSearchIndex:
+    """
+    In-process inverted index over product name, SKU, description and spec values
+    (including the denormalized material/coating/diameter columns).
+    Used instead of PostgreSQL full-text search when SEARCH_BACKEND="memory".
+
+    Terms are accent-folded ("Mũi Khoan" -> "mui", "khoan") and kept in a sorted
+    list so every query token can be prefix-matched with a binary search.
+    Rebuilt periodically by app.services.index_refresher, like the facet index.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: Dict[str, Set[int]] = {}
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._docs: Dict[int, DocMeta] = {}
+        self._sorted_terms: List[str] = []
+        self.is_built = False
+
+    # --- Building & incremental updates ---
+
+    def build(self, db: Session) -> None:
+        """
+        Build the whole index with two streaming queries, then swap it in atomically.
+        """
+        spec_values: Dict[int, List[str]] = defaultdict(list)
+        for product_id, value in db.query(ProductSpec.product_id, ProductSpec.value).yield_per(1000):
+            if value:
+                spec_values[product_id].append(value)
+
+        postings: Dict[str, Set[int]] = defaultdict(set)
+        doc_terms: Dict[int, Dict[str, float]] = {}
+        docs: Dict[int, DocMeta] = {}
+        rows = db.query(
+            Product.id, Product.name, Product.sku, Product.description,
+            Product.material, Product.coating, Product.diameter,
+            Product.category_id, Product.brand_id, Product.on_sale
+        ).yield_per(1000)
+        for row in rows:
+            values = [row.material, row.coating, row.diameter] + spec_values.get(row.id, [])
+            terms = self._weigh_terms(row.name, row.sku, row.description, values)
+            doc_terms[row.id] = terms
+            docs[row.id] = DocMeta(row.category_id, row.brand_id, bool(row.on_sale))
+            for term in terms:
+                postings[term].add(row.id)
+
+        with self._lock:
+            self._postings = dict(postings)
+            self._doc_terms = doc_terms
+            self._docs = docs
+            self._sorted_terms = sorted(postings)
+            self.is_built = True
+        logger.info("Search index built: %d products, %d terms", len(docs), len(postings))
+
+    def index_product(self, product: Product) -> None:
+        """
+        (Re)index a single product after it was created or updated.
+        """
+        if not self.is_built:
+            return
+        values = [product.material, product.coating, product.diameter]
+        values.extend(spec.value for spec in product.specs)
+        terms = self._weigh_terms(product.name, product.sku, product.description, values)
+        with self._lock:
+            self._remove_terms(product.id)
+            self._doc_terms[product.id] = terms
+            self._docs[product.id] = DocMeta(product.category_id, product.brand_id, bool(product.on_sale))
+            for term in terms:
+                if term not in self._postings:
+                    self._postings[term] = set()
+                    bisect.insort(self._sorted_terms, term)
+                self._postings[term].add(product.id)
+
+    def remove_product(self, product_id: int) -> None:
+        if not self.is_built:
+            return
+        with self._lock:
+            self._remove_terms(product_id)
+            self._docs.pop(product_id, None)
+
+    def _remove_terms(self, product_id: int) -> None:
+        for term in self._doc_terms.pop(product_id, {}):
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.discard(product_id)
+            if not posting:
+                del self._postings[term]
+                pos = bisect.bisect_left(self._sorted_terms, term)
+                if pos < len(self._sorted_terms) and self._sorted_terms[pos] == term:
+                    del self._sorted_terms[pos]
+
+    @staticmethod
+    def _weigh_terms(name: Optional[str], sku: Optional[str], description: Optional[str], spec_values: List[Optional[str]]) -> Dict[str, float]:
+        terms: Dict[str, float] = {}
+        fields = [(name, NAME_WEIGHT), (sku, SKU_WEIGHT), (description, DESCRIPTION_WEIGHT)]
+        fields.extend((value, SPEC_WEIGHT) for value in spec_values)
+        for text, weight in fields:
+            for token in tokenize(text):
+                if weight > terms.get(token, 0.0):
+                    terms[token] = weight
+        return terms
+
+    # --- Querying ---
+
+    def _expand(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._sorted_terms, prefix)
+        end = bisect.bisect_left(self._sorted_terms, prefix + "\uffff", lo=start)
+        return self._sorted_terms[start:end]
+
+    def search(
+        self,
+        query: str,
+        *,
+        category_ids: Optional[Set[int]] = None,
+        brand_id: Optional[int] = None,
+        on_sale: Optional[bool] = None,
+    ) -> List[int]:
+        """
+        Return matching product ids, best match first. Every query token must match
+        (as a whole word or as a prefix of one).
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            scores: Optional[Dict[int, float]] = None
+            for token in tokens:
+                token_scores: Dict[int, float] = {}
+                for term in self._expand(token):
+                    factor = 1.0 if term == token else PREFIX_PENALTY
+                    for product_id in self._postings[term]:
+                        score = self._doc_terms[product_id][term] * factor
+                        if score > token_scores.get(product_id, 0.0):
+                            token_scores[product_id] = score
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {pid: s + token_scores[pid] for pid, s in scores.items() if pid in token_scores}
+                if not scores:
+                    return []
+
+            results = []
+            for product_id, score in scores.items():
+                meta = self._docs[product_id]
+                if category_ids is not None and meta.category_id not in category_ids:
+                    continue
+                if brand_id is not None and meta.brand_id != brand_id:
+                    continue
+                if on_sale is not None and meta.on_sale != on_sale:
+                    continue
+                results.append((product_id, score))
+
+        results.sort(key=lambda r: (-r[1], r[0]))
+        return [product_id for product_id, _ in results]
+
+search_index = ProductSearchIndex()
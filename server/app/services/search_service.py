@@ -0,0 +1,70 @@
+import re
+import unicodedata
+from typing import List, Optional
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Query
+
+from app.models.product import Product
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+_LIKE_ESCAPE = "!"
+
+def fold_accents(text: str) -> str:
+    """
+    Lowercase and strip Vietnamese diacritics ("Mũi Khoan" -> "mui khoan").
+    Mirrors what unaccent() does on the database side.
+    """
+    text = text.replace("đ", "d").replace("Đ", "D")
+    decomposed = unicodedata.normalize("NFD", text)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall(fold_accents(text or ""))
+
+def _like_pattern(query: str) -> str:
+    escaped = query.replace("!", "!!").replace("%", "!%").replace("_", "!_")
+    return f"%{escaped}%"
+
+def build_tsquery(query: str) -> Optional[str]:
+    """
+    Turn free text into a prefix tsquery ("mui khoan 10" -> "mui:* & khoan:* & 10:*")
+    so partially typed words still match while the user is typing.
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        return None
+    return " & ".join(f"{token}:*" for token in tokens)
+
+def apply_fulltext_search(db_query: Query, query: str) -> Query:
+    """
+    Filter and rank products with the GIN-indexed search_vector (PostgreSQL only).
+    SKU fragments ("A002") fall back to a trigram-indexed ILIKE on sku.
+    """
+    query = query.strip()
+    sku_match = Product.sku.ilike(_like_pattern(query), escape=_LIKE_ESCAPE)
+    # Exact SKU hits always come first
+    rank = case((func.lower(Product.sku) == query.lower(), 1.0), else_=0.0)
+
+    tsquery_text = build_tsquery(query)
+    if tsquery_text:
+        ts_query = func.to_tsquery("simple", tsquery_text)
+        db_query = db_query.filter(or_(Product.search_vector.op("@@")(ts_query), sku_match))
+        rank = rank + func.ts_rank_cd(Product.search_vector, ts_query)
+    else:
+        db_query = db_query.filter(sku_match)
+
+    return db_query.order_by(rank.desc(), Product.id)
+
+def apply_ilike_search(db_query: Query, query: str) -> Query:
+    """
+    Portable fallback for databases without tsvector support (e.g. SQLite in development).
+    """
+    pattern = _like_pattern(query.strip())
+    return db_query.filter(
+        or_(
+            Product.name.ilike(pattern, escape=_LIKE_ESCAPE),
+            Product.sku.ilike(pattern, escape=_LIKE_ESCAPE),
+            Product.description.ilike(pattern, escape=_LIKE_ESCAPE)
+        )
+    )
@@ -0,0 +1,120 @@
+import re
+import zlib
+from datetime import datetime
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+from xml.sax.saxutils import escape
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.category import Category
+from app.models.product import Product
+
+# The sitemap protocol allows at most 50,000 URLs per file. Products are sharded by
+# id range so a product always lives in the same shard, however the catalog grows.
+URLS_PER_SHARD = 50000
+
+PAGES_SITEMAP = "sitemap-pages.xml.gz"
+_PRODUCT_SHARD_RE = re.compile(r"^sitemap-products-(\d+)\.xml\.gz$")
+
+STATIC_PAGES = [
+    ("/", "daily", "1.0"),
+    ("/products", "daily", "0.8"),
+    ("/promotions", "daily", "0.8"),
+    ("/contact", "monthly", "0.5"),
+]
+
+URLSET_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+URLSET_CLOSE = "</urlset>\n"
+INDEX_OPEN = '<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+INDEX_CLOSE = "</sitemapindex>\n"
+
+class SitemapFile(NamedTuple):
+    name: str
+    lastmod: Optional[datetime]
+
+def product_shard_name(shard: int) -> str:
+    return f"sitemap-products-{shard}.xml.gz"
+
+def parse_product_shard(name: str) -> Optional[int]:
+    match = _PRODUCT_SHARD_RE.match(name)
+    return int(match.group(1)) if match else None
+
+def shard_of(product_id: int) -> int:
+    return product_id // URLS_PER_SHARD
+
+def _url(loc: str, *, lastmod: Optional[datetime] = None, changefreq: str, priority: str) -> str:
+    parts = [f"  <url>\n    <loc>{escape(loc)}</loc>\n"]
+    if lastmod is not None:
+        parts.append(f"    <lastmod>{lastmod.strftime('%Y-%m-%d')}</lastmod>\n")
+    parts.append(f"    <changefreq>{changefreq}</changefreq>\n    <priority>{priority}</priority>\n  </url>\n")
+    return "".join(parts)
+
+def gzip_stream(chunks: Iterable[str]) -> Iterator[bytes]:
+    """
+    Gzip a stream of text chunks incrementally (wbits=31 writes the gzip container).
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode("utf-8"))
+        if data:
+            yield data
+    yield compressor.flush()
+
+def list_sitemaps(db: Session) -> List[SitemapFile]:
+    """
+    The files listed in sitemap_index.xml: the static/category pages plus one file
+    per non-empty product shard, with the newest updated_at of the shard as lastmod.
+    """
+    shard = (Product.id // URLS_PER_SHARD).label("shard")
+    rows = (
+        db.query(shard, func.max(Product.updated_at).label("lastmod"))
+        .group_by(shard)
+        .order_by(shard)
+        .all()
+    )
+    files = [SitemapFile(PAGES_SITEMAP, None)]
+    files.extend(SitemapFile(product_shard_name(int(row.shard)), row.lastmod) for row in rows)
+    return files
+
+def iter_sitemap_index(files: List[SitemapFile], base_url: str) -> Iterator[str]:
+    yield INDEX_OPEN
+    for file in files:
+        lastmod = f"    <lastmod>{file.lastmod.strftime('%Y-%m-%d')}</lastmod>\n" if file.lastmod else ""
+        yield f"  <sitemap>\n    <loc>{escape(base_url + '/' + file.name)}</loc>\n{lastmod}  </sitemap>\n"
+    yield INDEX_CLOSE
+
+def iter_pages_sitemap(db: Session, site_url: str) -> Iterator[str]:
+    yield URLSET_OPEN
+    for path, changefreq, priority in STATIC_PAGES:
+        yield _url(f"{site_url}{path}", changefreq=changefreq, priority=priority)
+    for (category_id,) in db.query(Category.id).order_by(Category.id).yield_per(1000):
+        yield _url(f"{site_url}/products?category_id={category_id}", changefreq="weekly", priority="0.7")
+    yield URLSET_CLOSE
+
+def iter_product_sitemap(db: Session, site_url: str, shard: int) -> Iterator[str]:
+    """
+    Stream one shard of product URLs; rows are fetched in batches, never all at once.
+    """
+    rows = (
+        db.query(Product.slug, Product.updated_at)
+        .filter(Product.id >= shard * URLS_PER_SHARD, Product.id < (shard + 1) * URLS_PER_SHARD)
+        .order_by(Product.id)
+        .yield_per(1000)
+    )
+    yield URLSET_OPEN
+    for slug, updated_at in rows:
+        yield _url(f"{site_url}/product/{slug}", lastmod=updated_at, changefreq="weekly", priority="0.9")
+    yield URLSET_CLOSE
+
+def iter_sitemap(db: Session, name: str, site_url: str = settings.SITE_URL) -> Optional[Iterator[str]]:
+    """
+    Stream the (uncompressed) XML of a sitemap file by name, or None for unknown names.
+    """
+    if name == PAGES_SITEMAP:
+        return iter_pages_sitemap(db, site_url)
+    shard = parse_product_shard(name)
+    if shard is not None:
+        return iter_product_sitemap(db, site_url, shard)
+    return None
@@ -0,0 +1,186 @@
+import logging
+import os
+import threading
+import time
+from typing import Iterable, Optional, Set
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.sitemap_service import (
+    PAGES_SITEMAP,
+    gzip_stream,
+    iter_sitemap,
+    iter_sitemap_index,
+    list_sitemaps,
+    parse_product_shard,
+    product_shard_name,
+    shard_of,
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows development setup: a single process, no lock needed
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "sitemap_index.xml"
+LOCK_FILE = ".writer.lock"
+MARKS_DIR = ".dirty"
+
+class SitemapWriter:
+    """
+    Keeps gzipped sitemap files under output_dir (served by the /static mount, and
+    by nginx in production) up to date from a background thread.
+
+    Only one process per output_dir writes: each worker's thread waits on a file
+    lock, and the one holding it does a full rebuild, then regenerates the files
+    marked dirty. Repository writes in any worker mark the file that contains the
+    changed row by creating a marker file under output_dir/.dirty, which the
+    writer collects every `delay` seconds, so a burst of admin edits costs one
+    rewrite. If the writer process dies, a waiting worker takes over. Failed
+    regenerations are retried with exponential backoff up to `max_retry_delay`.
+    Files are written to a temporary name and renamed, so readers never see a
+    partial file.
+    """
+
+    def __init__(self, output_dir: str, site_url: str, files_url: str, delay: float, max_retry_delay: float):
+        self.output_dir = output_dir
+        self.site_url = site_url
+        self.files_url = files_url
+        self.delay = delay
+        self.max_retry_delay = max_retry_delay
+        self._thread: Optional[threading.Thread] = None
+        self._lock_file = None
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.output_dir, name)
+
+    def index_path(self) -> Optional[str]:
+        path = self.path(INDEX_FILE)
+        return path if os.path.exists(path) else None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="sitemap-writer", daemon=True)
+        self._thread.start()
+
+    def mark_product_changed(self, product_id: int) -> None:
+        self._mark(product_shard_name(shard_of(product_id)))
+
+    def mark_pages_changed(self) -> None:
+        self._mark(PAGES_SITEMAP)
+
+    def _mark(self, name: str) -> None:
+        # Nothing to keep up to date when the writer isn't running (scripts, tests)
+        if self._thread is None:
+            return
+        try:
+            marks_dir = self.path(MARKS_DIR)
+            os.makedirs(marks_dir, exist_ok=True)
+            open(os.path.join(marks_dir, name), "a").close()
+        except OSError:
+            # Never fail the write that triggered it; the next full rebuild catches up
+            logger.warning("Cannot mark sitemap %s dirty", name, exc_info=True)
+
+    def _take_marks(self) -> Set[str]:
+        marks_dir = self.path(MARKS_DIR)
+        try:
+            names = set(os.listdir(marks_dir))
+        except FileNotFoundError:
+            return set()
+        for name in names:
+            # Removed before regenerating: a mark made meanwhile is picked up next round
+            try:
+                os.remove(os.path.join(marks_dir, name))
+            except FileNotFoundError:
+                pass
+        return names
+
+    def _retry_delay(self, failures: int) -> float:
+        return min(self.delay * 2 ** failures, self.max_retry_delay)
+
+    def _become_writer(self) -> None:
+        """
+        Block until this process holds the writer lock of output_dir.
+        """
+        failures = 0
+        while True:
+            try:
+                os.makedirs(self.path(MARKS_DIR), exist_ok=True)
+                lock_file = open(self.path(LOCK_FILE), "a")
+                if fcntl is not None:
+                    # Held until the process exits
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                self._lock_file = lock_file
+                return
+            except OSError:
+                failures += 1
+                retry_in = self._retry_delay(failures)
+                logger.exception("Cannot take the sitemap writer lock, retrying in %.0fs", retry_in)
+                time.sleep(retry_in)
+
+    def _run(self) -> None:
+        self._become_writer()
+        logger.info("Sitemap writer running in process %d", os.getpid())
+        names: Set[str] = set()
+        full = True
+        failures = 0
+        while True:
+            # Let a burst of writes settle before regenerating
+            time.sleep(self._retry_delay(failures) if failures else self.delay)
+            names |= self._take_marks()
+            if not names and not full:
+                continue
+            try:
+                self.regenerate(names, full=full)
+            except Exception:
+                failures += 1
+                logger.exception(
+                    "Sitemap regeneration failed (%d in a row), retrying in %.0fs",
+                    failures, self._retry_delay(failures),
+                )
+                continue
+            names, full, failures = set(), False, 0
+
+    def regenerate(self, names: Iterable[str], *, full: bool = False) -> None:
+        """
+        Rewrite the given sitemap files (or all of them) and then the index.
+        """
+        db = SessionLocal()
+        try:
+            files = list_sitemaps(db)
+            names = set(names)
+            if full:
+                names |= {file.name for file in files}
+                self._remove_stale({file.name for file in files})
+            for name in sorted(names):
+                self._write(name, gzip_stream(iter_sitemap(db, name, self.site_url)))
+            index = iter_sitemap_index(files, self.files_url)
+            self._write(INDEX_FILE, (chunk.encode("utf-8") for chunk in index))
+            logger.info("Sitemaps regenerated: %s", ", ".join(sorted(names)) or "index only")
+        finally:
+            db.close()
+
+    def _write(self, name: str, data: Iterable[bytes]) -> None:
+        path = self.path(name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            for chunk in data:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+
+    def _remove_stale(self, current: Set[str]) -> None:
+        for name in os.listdir(self.output_dir):
+            # Shards whose products were all deleted
+            if parse_product_shard(name) is not None and name not in current:
+                os.remove(self.path(name))
+
+sitemap_writer = SitemapWriter(
+    output_dir=settings.SITEMAP_DIR,
+    site_url=settings.SITE_URL,
+    files_url=f"{settings.SITE_URL}/static/sitemaps",
+    delay=settings.SITEMAP_REBUILD_DELAY,
+    max_retry_delay=settings.SITEMAP_RETRY_MAX_DELAY,
+)
@@ -5,6 +5,7 @@ from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 from app.models.product import Product, Brand
 from app.models.category import Category
+from app.repositories.category_repository import category_repository
 from datetime import datetime
 
 # Connect to DB
@@ -37,6 +38,8 @@ def seed():
                 parent_id=None
             )
             db.add(new_cat)
+            db.flush()
+            category_repository.add_closure_paths(db, category_id=new_cat.id, parent_id=new_cat.parent_id)
             db.commit()
             db.refresh(new_cat)
             created_categories[cat_data["slug"]] = new_cat
@@ -1,15 +1,31 @@
+import asyncio
 import sys
 sys.path.insert(0, '.')
 
-from app.core.email import send_contact_email
+# Sends a contact e-mail through the SMTP settings of .env. For a local stand-in:
+#   python -m aiosmtpd -n -l localhost:8025
+# with MAIL_SERVER=localhost, MAIL_PORT=8025, MAIL_USE_TLS=False, no MAIL_USERNAME/MAIL_PASSWORD,
+# and MAIL_DEFAULT_SENDER (plus MAIL_ADMIN_EMAIL, the digest recipient, if it differs) set
+from app.core.smtp import create_smtp_pool
+from app.services.email_service import contact_digest_email, contact_payload, missing_mail_settings, to_message
+
+async def main():
+    missing = missing_mail_settings()
+    if missing:
+        raise RuntimeError(f"Missing settings: {', '.join(missing)}")
+    pool = create_smtp_pool()
+    try:
+        await pool.send(to_message(contact_digest_email([contact_payload(
+            name="Test User",
+            email="test@test.com",
+            phone="0123456789",
+            message="This is a test message"
+        )])))
+    finally:
+        await pool.close()
 
 try:
-    send_contact_email(
-        name="Test User",
-        email="test@test.com",
-        phone="0123456789",
-        message="This is a test message"
-    )
+    asyncio.run(main())
     print("✅ Email sent successfully!")
 except Exception as e:
     print(f"❌ Error: {type(e).__name__}: {str(e)}")
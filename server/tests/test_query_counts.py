@@ -0,0 +1,132 @@
+"""
+Pins the number of SQL statements of the catalog and cart read paths, so a
+relationship that starts lazy-loading per row (N+1) fails here instead of in
+production. Runs on SQLite: python -m pytest tests
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import schemas
+from app.db import base  # noqa: F401  (all models)
+from app.db.base_class import Base
+from app.db.query_counter import QueryCounter, assert_max_queries
+from app.db.replicas import RoutingSession
+from app.models.cart import CartItem
+from app.models.category import Category
+from app.models.product import Brand, Product, ProductSpec
+from app.models.user import User
+from app.repositories.cart_repository import AsyncCartRepository
+from app.repositories.product_repository import async_product_repository, product_repository
+from app.services.cart_store import MemoryCartBackend
+from app.services.facet_index import FacetIndex
+
+PRODUCTS = 30
+
+@compiles(TSVECTOR, "sqlite")
+def _tsvector_on_sqlite(type_, compiler, **kw):
+    return "TEXT"
+
+@pytest.fixture(scope="module")
+def db_path(tmp_path_factory):
+    path = tmp_path_factory.mktemp("db") / "catalog.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        category = Category(name="Dao phay", slug="dao-phay")
+        brand = Brand(name="OSG", code="osg")
+        db.add_all([category, brand, User(id=1, email="khach@example.com", hashed_password="x")])
+        db.flush()
+        for i in range(PRODUCTS):
+            db.add(Product(
+                name=f"Dao phay {i}", sku=f"SKU-{i}", slug=f"dao-phay-{i}", price=100000 + i,
+                category_id=category.id, brand_id=brand.id, material="HSS" if i % 3 else "Carbide",
+                specs=[ProductSpec(key="Material", value="HSS"), ProductSpec(key="Flutes", value=str(i % 4))],
+            ))
+        db.flush()
+        db.add_all(CartItem(user_id=1, product_id=product_id, quantity=1) for product_id in range(1, 11))
+        db.commit()
+    engine.dispose()
+    return path
+
+@pytest.fixture
+def engine(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    yield engine
+    engine.dispose()
+
+def run_async(db_path, work):
+    async def main():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as db:
+                return await work(db)
+        finally:
+            await engine.dispose()
+    return asyncio.run(main())
+
+def test_product_list_is_two_queries(engine):
+    with Session(engine) as db, assert_max_queries(db, 2):
+        products = product_repository.search_products(db, limit=100)
+        payload = [schemas.product.Product.model_validate(p).model_dump() for p in products]
+    assert len(payload) == PRODUCTS
+    assert all(len(p["specs"]) == 2 and p["category"] and p["brand"] for p in payload)
+
+def test_product_list_summary_is_one_query(engine):
+    with Session(engine) as db, assert_max_queries(db, 1):
+        assert len(product_repository.search_products(db, limit=100, view="summary")) == PRODUCTS
+
+def test_replica_reads_are_counted(engine, db_path):
+    replica = create_engine(f"sqlite:///{db_path}")
+    try:
+        db = sessionmaker(class_=RoutingSession, bind=engine)(replica=replica)
+        with db, QueryCounter(db) as counter:
+            products = product_repository.search_products(db, limit=100)
+            [schemas.product.Product.model_validate(p) for p in products]
+        assert counter.engines == [engine, replica]
+        assert counter.count == 2, counter.statements
+    finally:
+        replica.dispose()
+
+def test_facets_are_counted_in_two_queries(engine):
+    with Session(engine) as db:
+        index = FacetIndex()
+        index.build(db)
+        expected = {
+            key: [{"value": value, "count": count} for value, count in values]
+            for key, values in index.counts(range(1, PRODUCTS + 1)).items()
+        }
+        with assert_max_queries(db, 2):
+            facets = product_repository.get_facets(db, on_sale=False)
+    assert facets == {"total": PRODUCTS, "facets": expected}
+
+def test_product_detail_is_two_queries(db_path):
+    async def work(db):
+        with assert_max_queries(db, 2):
+            product = await async_product_repository.get_by_slug(db, slug="dao-phay-7")
+            return schemas.product.Product.model_validate(product).model_dump()
+
+    payload = run_async(db_path, work)
+    assert payload["sku"] == "SKU-7" and len(payload["specs"]) == 2
+
+def test_cart_is_three_queries_then_two(db_path):
+    repository = AsyncCartRepository(CartItem, backend=MemoryCartBackend(ttl=60))
+
+    async def work(db):
+        # Cold: the cart is loaded from cart_item into the backend
+        with assert_max_queries(db, 3):
+            cold = await repository.get_by_user(db, user_id=1)
+            [schemas.cart.CartItem.model_validate(line) for line in cold]
+        # Warm: only the products are read
+        with assert_max_queries(db, 2):
+            warm = await repository.get_by_user(db, user_id=1)
+            [schemas.cart.CartItem.model_validate(line) for line in warm]
+        return cold, warm
+
+    cold, warm = run_async(db_path, work)
+    assert len(cold) == len(warm) == 10